@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, brier_score_loss, log_loss, roc_auc_score
+
+
+# ===================================
+# CONFIGURATION
+# ===================================
+
+CV_CACHE_PATH = "models/cv_cache.jsonl"
+CALIBRATION_BINS = 10
+
+METRICS = ["accuracy", "threshold_accuracy", "roc_auc", "brier", "log_loss", "ece"]
+
+
+# ===================================
+# KEYS
+# ===================================
+
+def _digest(*arrays):
+    digest = hashlib.sha256()
+    for array in arrays:
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def data_fingerprint(X, y):
+    """Hash of the features, their names and the labels."""
+    columns = list(getattr(X, "columns", []))
+    return _digest(np.asarray(X, dtype=np.float64), np.asarray(y), np.array(columns, dtype=str))
+
+
+def estimator_key(estimator):
+    """Estimator class and every (nested) parameter, as a stable string."""
+    params = estimator.get_params(deep=True)
+    return json.dumps([type(estimator).__name__, params], sort_keys=True, default=repr)
+
+
+def fold_key(fingerprint, estimator, train_idx, test_idx, threshold):
+    return hashlib.sha256(json.dumps(
+        [fingerprint, estimator_key(estimator), _digest(train_idx, test_idx), threshold]
+    ).encode()).hexdigest()
+
+
+# ===================================
+# METRICS
+# ===================================
+
+def expected_calibration_error(y_true, prob, n_bins=CALIBRATION_BINS):
+    """Row-weighted gap between mean predicted and observed rate per probability bin."""
+    bins = np.minimum((prob * n_bins).astype(int), n_bins - 1)
+    counts = np.bincount(bins, minlength=n_bins)
+    predicted = np.bincount(bins, weights=prob, minlength=n_bins)
+    observed = np.bincount(bins, weights=y_true, minlength=n_bins)
+    return float(np.abs(predicted - observed).sum() / len(prob))
+
+
+def score_fold(y_true, prob, threshold=None):
+    """
+    Binary classification metrics of one test fold. ROC-AUC is left out
+    when the fold holds a single class, where it is undefined.
+    """
+    y_true = np.asarray(y_true)
+    scores = {
+        # what estimator.score / cross_val_score report
+        "accuracy": accuracy_score(y_true, (prob > 0.5).astype(int)),
+        "brier": brier_score_loss(y_true, prob),
+        "log_loss": log_loss(y_true, prob, labels=[0, 1]),
+        "ece": expected_calibration_error(y_true, prob),
+    }
+    if len(np.unique(y_true)) > 1:
+        scores["roc_auc"] = roc_auc_score(y_true, prob)
+    if threshold is not None:
+        scores["threshold_accuracy"] = accuracy_score(y_true, (prob > threshold).astype(int))
+    return {name: float(value) for name, value in scores.items()}
+
+
+# ===================================
+# ENGINE
+# ===================================
+
+def _fit_fold(estimator, X, y, split, train_idx, test_idx, threshold, key):
+    start = time.perf_counter()
+    estimator.fit(X[train_idx], y[train_idx])
+    fit_seconds = time.perf_counter() - start
+
+    prob = estimator.predict_proba(X[test_idx])[:, 1]
+    return {"key": key, "split": split, "fit_seconds": fit_seconds,
+            **score_fold(y[test_idx], prob, threshold)}
+
+
+def _load_cache(cache_path):
+    cache = {}
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path) as f:
+            for line in f:
+                # a run killed mid-write leaves a truncated last line
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                cache[record["key"]] = record
+    return cache
+
+
+def cross_validate(estimator, X, y, cv, threshold=None, n_jobs=-1, cache_path=CV_CACHE_PATH):
+    """
+    Cross-validate a binary classifier, one parallel job per split.
+
+    Every split's metrics are cached in `cache_path` under a hash of the
+    data, the estimator parameters, the split indices and `threshold`, so
+    only splits never seen before are fitted; results are appended as they
+    finish, so an interrupted run resumes. `threshold` adds the accuracy of
+    the `prob > threshold` decision rule.
+
+    Returns (records, summary): one record per split and, per metric, its
+    mean and std over the splits where it is defined and the number of
+    those ("valid"), plus the number of cached and fitted splits.
+    """
+    X_values = np.asarray(X, dtype=np.float64)
+    y_values = np.asarray(y)
+    fingerprint = data_fingerprint(X, y)
+    cache = _load_cache(cache_path)
+
+    records = {}
+    tasks = []
+    for split, (train_idx, test_idx) in enumerate(cv.split(X_values, y_values)):
+        key = fold_key(fingerprint, estimator, train_idx, test_idx, threshold)
+        if key in cache:
+            records[split] = {**cache[key], "split": split}
+        else:
+            tasks.append(delayed(_fit_fold)(
+                clone(estimator), X_values, y_values, split, train_idx, test_idx, threshold, key
+            ))
+
+    n_cached = len(records)
+    if tasks:
+        if cache_path:
+            os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        results = Parallel(n_jobs=n_jobs, return_as="generator_unordered")(tasks)
+        for record in results:
+            records[record["split"]] = record
+            if cache_path:
+                with open(cache_path, "a") as f:
+                    f.write(json.dumps(record) + "\n")
+
+    records = [records[split] for split in sorted(records)]
+    summary = {"cached": n_cached, "fitted": len(tasks)}
+    for metric in METRICS:
+        # undefined metrics are missing, or NaN in records cached by older runs
+        values = [r[metric] for r in records if metric in r and not np.isnan(r[metric])]
+        if values:
+            summary[metric] = {"mean": float(np.mean(values)), "std": float(np.std(values)),
+                               "valid": len(values)}
+
+    return records, summary
@@ -1,95 +1,106 @@
 import pandas as pd
-import os
+import numpy as np
 from datetime import datetime
 
+from ingest import read_dataset, write_output
+from stage_timer import stage
 
-# ======================================
-# 1️⃣ LOAD DATA
-# ======================================
 
 DATA_PATH = "dataset/Final Lead Data.xlsx"
+OUTPUT_PATH = "outputs/graduation_estimation.xlsx"
 
-df = pd.read_excel(DATA_PATH)
-
-print("\nTotal Rows:", len(df))
+YEAR_TEXT_COLUMN = "What is your current academic year?"
+COURSE_DURATION = 4
 
 
 # ======================================
-# 2️⃣ PREPARE YEAR LEVEL
+# 1️⃣ YEAR LEVEL FROM TEXT
 # ======================================
 
-# Convert Academic Year to numeric safely
-df["Academic Year"] = pd.to_numeric(df["Academic Year"], errors="coerce")
+def extract_year_level(text):
+    """
+    Year level (1-4) from the free-text academic year column.
 
+    The first matching rule wins: "1", "2", "3", then "4" or "final"
+    (case-insensitive). Missing or unmatched text gives NaN.
 
-# Extract year level from text column (fallback)
-def extract_year_from_text(text):
-    if pd.isna(text):
-        return None
+    The rules run as vectorized string operations over the distinct
+    values only and are broadcast back through the factorized codes,
+    so the cost barely grows with the number of rows.
+    """
+    codes, uniques = pd.factorize(text)
+    lowered = pd.Series(uniques, dtype=object).astype(str).str.lower()
 
-    text = str(text).lower()
+    levels = np.select(
+        [
+            lowered.str.contains("1", regex=False),
+            lowered.str.contains("2", regex=False),
+            lowered.str.contains("3", regex=False),
+            lowered.str.contains("4", regex=False) | lowered.str.contains("final", regex=False),
+        ],
+        [1.0, 2.0, 3.0, 4.0],
+        default=np.nan,
+    )
 
-    if "1" in text:
-        return 1
-    elif "2" in text:
-        return 2
-    elif "3" in text:
-        return 3
-    elif "4" in text or "final" in text:
-        return 4
-    else:
-        return None
+    # code -1 (missing text) picks the trailing NaN
+    levels = np.append(levels, np.nan)
+    return pd.Series(levels[codes], index=text.index)
 
 
-df["Text_Year_Level"] = df["What is your current academic year?"].apply(
-    extract_year_from_text
-)
+# ======================================
+# 2️⃣ GRADUATION ESTIMATE
+# ======================================
 
-# Use Academic Year first, else fallback to text
-df["Final_Year_Level"] = df["Academic Year"].combine_first(
-    df["Text_Year_Level"]
-)
+def estimate_graduation(df, current_year=None, course_duration=COURSE_DURATION):
+    """
+    Add Text_Year_Level, Final_Year_Level, Estimated_Graduation_Year and
+    Graduation_Flag to a copy of a lead data frame.
 
-print("\nMissing Final Year Level Count:",
-      df["Final_Year_Level"].isna().sum())
+    Academic Year is used first and the text column is the fallback.
+    """
+    if current_year is None:
+        current_year = datetime.now().year
 
+    df = df.copy()
 
-# ======================================
-# 3️⃣ ASSUME COURSE DURATION
-# ======================================
+    # Convert Academic Year to numeric safely
+    df["Academic Year"] = pd.to_numeric(df["Academic Year"], errors="coerce")
 
-COURSE_DURATION = 4
-current_year = datetime.now().year
+    df["Text_Year_Level"] = extract_year_level(df[YEAR_TEXT_COLUMN])
 
+    # Use Academic Year first, else fallback to text
+    df["Final_Year_Level"] = df["Academic Year"].combine_first(
+        df["Text_Year_Level"]
+    )
 
-# ======================================
-# 4️⃣ CALCULATE ESTIMATED GRADUATION YEAR
-# ======================================
+    # NaN year levels stay NaN, and NaN <= year is False -> flag 0
+    df["Estimated_Graduation_Year"] = current_year + (course_duration - df["Final_Year_Level"])
+    df["Graduation_Flag"] = (df["Estimated_Graduation_Year"] <= current_year).astype(int)
 
-df["Estimated_Graduation_Year"] = df["Final_Year_Level"].apply(
-    lambda x: current_year + (COURSE_DURATION - x)
-    if pd.notna(x)
-    else None
-)
+    return df
 
 
 # ======================================
-# 5️⃣ CREATE 0/1 GRADUATION FLAG
+# 3️⃣ RUN
 # ======================================
 
-df["Graduation_Flag"] = df["Estimated_Graduation_Year"].apply(
-    lambda x: 1 if pd.notna(x) and x <= current_year else 0
-)
+def main():
+    with stage("graduation.read"):
+        df = read_dataset(DATA_PATH)
 
+    print("\nTotal Rows:", len(df))
 
-# ======================================
-# 6️⃣ SAVE OUTPUT
-# ======================================
+    with stage("graduation.estimate"):
+        df = estimate_graduation(df)
 
-os.makedirs("outputs", exist_ok=True)
+    print("\nMissing Final Year Level Count:",
+          df["Final_Year_Level"].isna().sum())
 
-OUTPUT_PATH = "outputs/graduation_estimation.xlsx"
+    with stage("graduation.write"):
+        output_path = write_output(df, OUTPUT_PATH)
+
+    print("\nGraduation estimation saved to:", output_path)
 
-df.to_excel(OUTPUT_PATH, index=False)
 
-print("\nGraduation estimation saved to:", OUTPUT_PATH)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+# ===================================
+# CONFIGURATION
+# ===================================
+
+CACHE_DIR = "dataset/cache"
+
+# Columnar cache layout: "parquet" (needs pyarrow) or "pickle"
+CACHE_FORMAT = os.environ.get("PS1_CACHE_FORMAT", "parquet" if HAS_PYARROW else "pickle")
+
+# Output format of the scripts: "xlsx", "parquet" or "csv"
+OUTPUT_FORMAT = os.environ.get("PS1_OUTPUT_FORMAT", "xlsx")
+OUTPUT_FORMATS = ("xlsx", "parquet", "csv")
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# ===================================
+# COLUMNAR CACHE
+# ===================================
+
+def _cache_dir(path):
+    return os.path.join(CACHE_DIR, os.path.splitext(os.path.basename(path))[0])
+
+
+def _read_meta(cache_dir):
+    meta_path = os.path.join(cache_dir, "meta.json")
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        return json.load(f)
+
+
+def _valid_meta(path, cache_dir):
+    """meta.json of the cache if it was built from the current file."""
+    meta = _read_meta(cache_dir)
+    if meta is None:
+        return None
+    if meta["source_signature"] == file_signature(path):
+        return meta
+
+    # Touched or copied but maybe unchanged: the content hash decides
+    if meta["source_hash"] == file_hash(path):
+        meta["source_signature"] = file_signature(path)
+        with open(os.path.join(cache_dir, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        return meta
+    return None
+
+
+def build_cache(path):
+    """
+    Parse the workbook once and store it column by column.
+
+    Typed columns go into one Parquet file; object columns holding mixed
+    Python values (which Parquet can't type) and every column when
+    CACHE_FORMAT is "pickle" are pickled one file per column. Both can be
+    read back a column at a time.
+    """
+    df = pd.read_excel(path)
+    cache_dir = _cache_dir(path)
+    tmp_dir = f"{cache_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    use_parquet = CACHE_FORMAT == "parquet" and HAS_PYARROW
+    columns = [str(c) for c in df.columns]
+    df.columns = columns
+
+    pickled = [c for c in columns if not use_parquet or df[c].dtype == object]
+    typed = [c for c in columns if c not in pickled]
+
+    if typed:
+        df[typed].to_parquet(os.path.join(tmp_dir, "data.parquet"), index=False)
+    for c in pickled:
+        df[c].to_pickle(os.path.join(tmp_dir, f"{columns.index(c)}.pkl"))
+
+    meta = {
+        "source_hash": file_hash(path),
+        "source_signature": file_signature(path),
+        "rows": len(df),
+        "columns": columns,
+        "pickled": pickled,
+    }
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+    return meta
+
+
+def read_dataset(path, columns=None):
+    """
+    pd.read_excel(path)[columns], served from the columnar cache.
+
+    The cache is (re)built when the workbook's content hash changes; only
+    the requested columns are read from it.
+    """
+    cache_dir = _cache_dir(path)
+    meta = _valid_meta(path, cache_dir) or build_cache(path)
+
+    columns = meta["columns"] if columns is None else list(columns)
+    missing = [c for c in columns if c not in meta["columns"]]
+    if missing:
+        raise KeyError(f"Columns not in {path}: {missing}")
+
+    typed = [c for c in columns if c not in meta["pickled"]]
+    parts = {}
+    if typed:
+        parts.update(pd.read_parquet(os.path.join(cache_dir, "data.parquet"), columns=typed))
+    for c in columns:
+        if c in meta["pickled"]:
+            parts[c] = pd.read_pickle(os.path.join(cache_dir, f"{meta['columns'].index(c)}.pkl"))
+
+    return pd.DataFrame({c: parts[c] for c in columns}, index=pd.RangeIndex(meta["rows"]))
+
+
+# ===================================
+# OUTPUTS
+# ===================================
+
+class XlsxAppender:
+    """Write-only openpyxl workbook filled one DataFrame chunk at a time.
+
+    Rows are streamed to the file instead of kept as cell objects.
+    """
+
+    def __init__(self, path):
+        from openpyxl import Workbook
+
+        self.path = path
+        self.wb = Workbook(write_only=True)
+        self.ws = self.wb.create_sheet("Sheet1")
+        self.has_header = False
+
+    def write(self, df):
+        if not self.has_header:
+            self.ws.append([str(c) for c in df.columns])
+            self.has_header = True
+
+        # Blank cells for missing values, as DataFrame.to_excel writes them
+        values = df.astype(object).where(df.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            self.ws.append([v.item() if isinstance(v, np.generic) else v for v in row])
+
+    def close(self):
+        self.wb.save(self.path)
+
+
+def _write_xlsx(df, path):
+    writer = XlsxAppender(path)
+    writer.write(df)
+    writer.close()
+
+
+def write_output(df, path, fmt=None):
+    """
+    Save a script's result table as OUTPUT_FORMAT (or `fmt`).
+
+    `path` is the .xlsx path of the script; parquet and csv outputs swap
+    the extension. Returns the path written.
+    """
+    fmt = fmt or OUTPUT_FORMAT
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {fmt}")
+
+    path = f"{os.path.splitext(path)[0]}.{fmt}"
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    if fmt == "xlsx":
+        _write_xlsx(df, path)
+    elif fmt == "parquet":
+        # mixed-type object columns are stored as text
+        mixed = {c: "string" for c in df.columns if df[c].dtype == object}
+        df.astype(mixed).to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False)
+    return path
@@ -1,15 +1,16 @@
-import pandas as pd
-import numpy as np
-import os
-import joblib
 
-from sklearn.model_selection import train_test_split, RepeatedStratifiedKFold, cross_val_score
+from sklearn.model_selection import train_test_split, RepeatedStratifiedKFold
 from sklearn.linear_model import LogisticRegression
 from sklearn.calibration import CalibratedClassifierCV
 from sklearn.preprocessing import StandardScaler
 from sklearn.pipeline import Pipeline
 from sklearn.metrics import accuracy_score, confusion_matrix, roc_auc_score
 
+from cv_engine import cross_validate
+from ingest import read_dataset, write_output
+from score_placement import save_model
+from stage_timer import stage
+
 
 # ===================================
 # 1️⃣ LOAD DATA
@@ -17,7 +18,8 @@ from sklearn.metrics import accuracy_score, confusion_matrix, roc_auc_score
 
 DATA_PATH = "dataset/01 Train Data.xlsx"
 
-df = pd.read_excel(DATA_PATH)
+with stage("placement.read"):
+    df = read_dataset(DATA_PATH)
 
 df = df[df["Placement Status"].notna()].copy()
 
@@ -72,7 +74,8 @@ pipeline = Pipeline([
 # Calibrated model
 model = CalibratedClassifierCV(pipeline, method="sigmoid", cv=5)
 
-model.fit(X_train, y_train)
+with stage("placement.fit"):
+    model.fit(X_train, y_train)
 
 
 # ===================================
@@ -97,17 +100,29 @@ print("Confusion Matrix:\n", conf_matrix)
 # 7️⃣ REPEATED CV
 # ===================================
 
+# Splits run in parallel and are cached by data + parameters, so a rerun
+# on unchanged data only reads models/cv_cache.jsonl
 cv = RepeatedStratifiedKFold(n_splits=5, n_repeats=5, random_state=42)
-cv_scores = cross_val_score(model, X, y, cv=cv)
+with stage("placement.repeated_cv"):
+    cv_records, cv_summary = cross_validate(model, X, y, cv=cv, threshold=base_rate)
 
-print("Repeated CV Mean Accuracy:", round(cv_scores.mean(), 3))
+print("Repeated CV Mean Accuracy:", round(cv_summary["accuracy"]["mean"], 3))
+print("Repeated CV Accuracy (base-rate rule):", round(cv_summary["threshold_accuracy"]["mean"], 3))
+print("Repeated CV ROC-AUC:", round(cv_summary["roc_auc"]["mean"], 3),
+      "±", round(cv_summary["roc_auc"]["std"], 3),
+      f"({cv_summary['roc_auc']['valid']} of {len(cv_records)} splits with both classes)")
+print("Repeated CV Brier Score:", round(cv_summary["brier"]["mean"], 4))
+print("Repeated CV Log Loss:", round(cv_summary["log_loss"]["mean"], 4))
+print("Repeated CV ECE:", round(cv_summary["ece"]["mean"], 4))
+print(f"CV splits: {cv_summary['fitted']} fitted, {cv_summary['cached']} cached")
 
 
 # ===================================
 # 8️⃣ FULL DATA RISK SCORES
 # ===================================
 
-all_probs = model.predict_proba(X)[:, 1]
+with stage("placement.score_all"):
+    all_probs = model.predict_proba(X)[:, 1]
 all_preds = (all_probs > base_rate).astype(int)
 
 df["Placement_Probability"] = all_probs
@@ -118,12 +133,12 @@ df["Placement_Prediction"] = all_preds
 # 9️⃣ SAVE OUTPUT
 # ===================================
 
-os.makedirs("outputs", exist_ok=True)
-os.makedirs("models", exist_ok=True)
-
 OUTPUT_PATH = "outputs/placement_risk_predictions.xlsx"
 
-df.to_excel(OUTPUT_PATH, index=False)
-joblib.dump(model, "models/placement_risk_model.pkl")
+with stage("placement.write"):
+    output_path = write_output(df, OUTPUT_PATH)
+
+    # The base-rate threshold is saved with the model for score_placement.py
+    save_model(model, base_rate, features, n_rows=len(df))
 
-print("\nPredictions saved to:", OUTPUT_PATH)
+print("\nPredictions saved to:", output_path)
@@ -0,0 +1,199 @@
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from ingest import XlsxAppender, file_hash
+from stage_timer import stage
+
+
+# ===================================
+# CONFIGURATION
+# ===================================
+
+MODEL_PATH = "models/placement_risk_model.pkl"
+# Decision threshold and features of the saved model
+META_PATH = "models/placement_risk_model.json"
+
+FEATURES = ["CGPA", "Speaking Skills", "ML Knowledge"]
+CHUNKSIZE = 50_000
+# Batched matrix products differ in the last bit between chunk sizes
+PROBABILITY_DECIMALS = 10
+
+
+# ===================================
+# MODEL + META
+# ===================================
+
+def save_model(model, base_rate, features=FEATURES, n_rows=None):
+    """Save the calibrated model and, next to it, the threshold it is used with."""
+    os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
+    joblib.dump(model, MODEL_PATH)
+    with open(META_PATH, "w") as f:
+        json.dump({
+            "base_rate": float(base_rate),
+            "features": list(features),
+            "training_rows": n_rows,
+            "model_sha256": file_hash(MODEL_PATH),
+        }, f, indent=2)
+
+
+def load_meta():
+    if not os.path.exists(META_PATH):
+        raise FileNotFoundError(f"{META_PATH} not found. Run placement_pipeline.py first.")
+    with open(META_PATH) as f:
+        meta = json.load(f)
+    if meta["model_sha256"] != file_hash(MODEL_PATH):
+        raise ValueError(f"{MODEL_PATH} does not match {META_PATH}. Run placement_pipeline.py again.")
+    return meta
+
+
+# ===================================
+# READING
+# ===================================
+
+def read_chunks(path, chunksize=CHUNKSIZE):
+    """
+    DataFrames of at most `chunksize` rows from a CSV or an Excel workbook.
+
+    No dtypes are inferred per chunk, which would write the same cell as
+    2293940357 or 2293940357.0 depending on its neighbours: CSV fields stay
+    text and workbook cells keep the int, float or text type of the cell,
+    so the output does not depend on `chunksize`.
+    """
+    if not path.endswith((".xlsx", ".xlsm")):
+        yield from pd.read_csv(path, chunksize=chunksize, dtype=str,
+                               keep_default_na=False, na_values=[""])
+        return
+
+    # read-only mode streams the sheet instead of building every cell
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = list(next(rows))
+        block = []
+        for row in rows:
+            block.append(row)
+            if len(block) == chunksize:
+                yield pd.DataFrame(block, columns=header, dtype=object)
+                block = []
+        if block:
+            yield pd.DataFrame(block, columns=header, dtype=object)
+    finally:
+        wb.close()
+
+
+# ===================================
+# SCORING
+# ===================================
+
+_model = None
+
+
+def _init_worker(model_path):
+    """Process pool initializer: every worker unpickles the model once."""
+    global _model
+    _model = joblib.load(model_path)
+
+
+def _predict(values, features):
+    """Placement probability of each complete row, NaN where a feature is missing."""
+    prob = np.full(len(values), np.nan)
+    complete = ~np.isnan(values).any(axis=1)
+    if complete.any():
+        X = pd.DataFrame(values[complete], columns=features)
+        prob[complete] = _model.predict_proba(X)[:, 1]
+    return prob
+
+
+def _features(chunk, features):
+    return chunk[features].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+
+
+def _finish(chunk, prob, base_rate):
+    chunk = chunk.copy()
+    chunk["Placement_Probability"] = prob.round(PROBABILITY_DECIMALS)
+    chunk["Placement_Prediction"] = pd.array(
+        np.where(np.isnan(prob), np.nan, prob > base_rate), dtype="Int64"
+    )
+    return chunk
+
+
+def score_chunks(path, chunksize=CHUNKSIZE, workers=1):
+    """
+    Yield every chunk of `path` with Placement_Probability and
+    Placement_Prediction (probability > the saved base rate) added.
+
+    With workers > 1, chunks are scored by a process pool whose workers
+    load the model once; at most 2 x workers chunks are in flight and
+    results come back in file order.
+    """
+    meta = load_meta()
+    features, base_rate = meta["features"], meta["base_rate"]
+
+    if workers <= 1:
+        _init_worker(MODEL_PATH)
+        for chunk in read_chunks(path, chunksize):
+            yield _finish(chunk, _predict(_features(chunk, features), features), base_rate)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(MODEL_PATH,)) as pool:
+        pending = deque()
+        for chunk in read_chunks(path, chunksize):
+            pending.append((chunk, pool.submit(_predict, _features(chunk, features), features)))
+            if len(pending) >= 2 * workers:
+                chunk, future = pending.popleft()
+                yield _finish(chunk, future.result(), base_rate)
+        while pending:
+            chunk, future = pending.popleft()
+            yield _finish(chunk, future.result(), base_rate)
+
+
+def score_file(input_path, output_path, chunksize=CHUNKSIZE, workers=1):
+    """Score a lead file chunk by chunk into a CSV or .xlsx file. Returns the row count."""
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    xlsx = XlsxAppender(output_path) if output_path.endswith(".xlsx") else None
+
+    rows = 0
+    for i, chunk in enumerate(score_chunks(input_path, chunksize, workers)):
+        if xlsx:
+            xlsx.write(chunk)
+        else:
+            chunk.to_csv(output_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        rows += len(chunk)
+
+    if xlsx:
+        xlsx.close()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a lead file with the saved placement risk model")
+    parser.add_argument("input", help="CSV or .xlsx file with " + ", ".join(FEATURES))
+    parser.add_argument("output", help="CSV or .xlsx file to write")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE, help="rows scored per batch")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="scoring processes (-1: all CPUs)")
+    args = parser.parse_args()
+
+    workers = os.cpu_count() if args.workers == -1 else args.workers
+
+    start = time.perf_counter()
+    with stage("placement.score_file", workers=str(workers)):
+        rows = score_file(args.input, args.output, args.chunksize, workers)
+
+    print(f"\nScored {rows} rows in {time.perf_counter() - start:.1f}s")
+    print("Predictions saved to:", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+# ===================================
+# CONFIGURATION
+# ===================================
+
+# Off unless INSTRUMENTATION=1; while off, stage() is a shared no-op
+ENABLED = os.environ.get("INSTRUMENTATION", "").lower() in ("1", "true", "yes", "on")
+LOG_DIR = os.environ.get("INSTRUMENTATION_DIR", "logs")
+
+LOG_PATH = os.path.join(LOG_DIR, "stages.jsonl")
+SNAPSHOT_PATH = os.path.join(LOG_DIR, "stages.prom")
+
+MB = 1024 * 1024
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+_lock = threading.Lock()
+_totals = {}
+
+
+# ===================================
+# STAGES
+# ===================================
+
+def _peak_rss():
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.rss_start = _peak_rss()
+        self.cpu_start = time.process_time()
+        self.wall_start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall_start
+        cpu = time.process_time() - self.cpu_start
+        rss = _peak_rss()
+
+        record = {
+            "ts": round(time.time(), 3),
+            "pid": os.getpid(),
+            "stage": self.name,
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "peak_rss_mb": round(rss / MB, 1),
+            "rss_growth_mb": round((rss - self.rss_start) / MB, 1),
+        }
+        if self.labels:
+            record["labels"] = self.labels
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+
+        key = (self.name, tuple(sorted(self.labels.items())))
+        with _lock:
+            totals = _totals.setdefault(key, {"calls": 0, "errors": 0, "wall": 0.0,
+                                              "cpu": 0.0, "peak_rss": 0})
+            totals["calls"] += 1
+            totals["errors"] += exc_type is not None
+            totals["wall"] += wall
+            totals["cpu"] += cpu
+            totals["peak_rss"] = max(totals["peak_rss"], rss)
+
+            os.makedirs(LOG_DIR, exist_ok=True)
+            with open(LOG_PATH, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        return False
+
+
+def stage(name, **labels):
+    """
+    Context manager timing one step of a script.
+
+    With INSTRUMENTATION=1 every finished stage appends a JSON line (wall
+    and CPU seconds, process peak RSS) to logs/stages.jsonl, and the
+    per-stage totals are written to logs/stages.prom at exit.
+    """
+    if not ENABLED:
+        return _NULL_STAGE
+    return _Stage(name, labels)
+
+
+# ===================================
+# PROMETHEUS SNAPSHOT
+# ===================================
+
+METRICS = [
+    ("stage_calls_total", "counter", "calls"),
+    ("stage_errors_total", "counter", "errors"),
+    ("stage_wall_seconds_total", "counter", "wall"),
+    ("stage_cpu_seconds_total", "counter", "cpu"),
+    ("stage_peak_rss_bytes", "gauge", "peak_rss"),
+]
+
+
+def prometheus_text():
+    with _lock:
+        totals = {key: dict(values) for key, values in _totals.items()}
+
+    lines = []
+    for metric, kind, field in METRICS:
+        lines.append(f"# TYPE {metric} {kind}")
+        for (name, labels), values in sorted(totals.items()):
+            label_text = ",".join(f'{k}="{v}"' for k, v in (("stage", name), *labels))
+            lines.append(f"{metric}{{{label_text}}} {round(values[field], 6)}")
+    return "\n".join(lines) + "\n"
+
+
+@atexit.register
+def _write_snapshot():
+    if not _totals:
+        return
+    tmp_path = f"{SNAPSHOT_PATH}.tmp-{os.getpid()}"
+    with open(tmp_path, "w") as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, SNAPSHOT_PATH)
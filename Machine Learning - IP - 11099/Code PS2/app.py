@@ -1,9 +1,10 @@
 import streamlit as st
-import pandas as pd
 
-from src.predict_top3 import predict_top_3
-from src.other_interpreter import interpret_other
-from src.recommend_field_and_career import recommend_fields_and_careers
+from src.slider_limits import FEATURE_LIMITS
+
+# pandas, sklearn and the model code are imported where they are used, so
+# the profile page renders without waiting for them; the warm-up below
+# imports and loads them in the background
 
 # -------------------------------------------------
 # PAGE CONFIG
@@ -14,6 +15,40 @@ st.set_page_config(
     layout="centered"
 )
 
+# -------------------------------------------------
+# WARM-UP (ONCE PER SERVER PROCESS)
+# -------------------------------------------------
+@st.cache_resource(show_spinner=False)
+def start_warm_up():
+    """Load the model, preprocessor, encoder and index in a background thread."""
+    from concurrent.futures import ThreadPoolExecutor
+    from src.warmup import warm_up
+
+    def warm_up_app():
+        timings = warm_up()
+        # st.bar_chart (what-if panel) imports altair on its first use
+        import altair  # noqa: F401
+        return timings
+
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="warm-up")
+    future = executor.submit(warm_up_app)
+    executor.shutdown(wait=False)
+    return future
+
+
+def wait_for_warm_up():
+    warm_up = start_warm_up()
+    if not warm_up.done():
+        with st.spinner("⏳ Loading the model..."):
+            warm_up.exception()
+    if warm_up.exception() is not None:
+        # Retried on the next run, e.g. once the model files are in place
+        start_warm_up.clear()
+        raise warm_up.exception()
+
+
+start_warm_up()
+
 # -------------------------------------------------
 # SESSION STATE INIT
 # -------------------------------------------------
@@ -47,6 +82,12 @@ page = st.radio(
 # -------------------------------------------------
 # PAGE 1 — STUDENT PROFILE
 # -------------------------------------------------
+def profile_slider(label, feature, default):
+    """Slider over the range and step the what-if explorer also uses."""
+    low, high, step = FEATURE_LIMITS[feature]
+    return st.slider(label, low, high, default, step)
+
+
 if page == "🧾 Student Profile":
 
     st.subheader("📋 Enter Student Details")
@@ -54,22 +95,22 @@ if page == "🧾 Student Profile":
     col1, col2 = st.columns(2)
 
     with col1:
-        gpa = st.slider("GPA", 0.0, 10.0, 7.5)
-        field_courses = st.slider("Field Specific Courses", 0, 10, 5)
-        internships = st.slider("Internships", 0, 5, 1)
-        projects = st.slider("Projects", 0, 10, 3)
-        research = st.slider("Research Experience", 0, 5, 1)
-        certifications = st.slider("Industry Certifications", 0, 5, 1)
-        presentation = st.slider("Presentation Skills", 0, 5, 3)
-        networking = st.slider("Networking Skills", 0, 5, 2)
+        gpa = profile_slider("GPA", "GPA", 7.5)
+        field_courses = profile_slider("Field Specific Courses", "Field_Specific_Courses", 5)
+        internships = profile_slider("Internships", "Internships", 1)
+        projects = profile_slider("Projects", "Projects", 3)
+        research = profile_slider("Research Experience", "Research_Experience", 1)
+        certifications = profile_slider("Industry Certifications", "Industry_Certifications", 1)
+        presentation = profile_slider("Presentation Skills", "Presentation_Skills", 3)
+        networking = profile_slider("Networking Skills", "Networking_Skills", 2)
     with col2:
-        extracurricular = st.slider("Extracurricular Activities", 0, 10, 3)
-        leadership = st.slider("Leadership Positions", 0, 5, 1)
-        coding = st.slider("Coding Skills", 0, 5, 3)
-        communication = st.slider("Communication Skills", 0, 5, 3)
-        problem_solving = st.slider("Problem Solving Skills", 0, 5, 3)
-        analytical = st.slider("Analytical Skills", 0, 5, 3)
-        teamwork = st.slider("Teamwork Skills", 0, 5, 3)
+        extracurricular = profile_slider("Extracurricular Activities", "Extracurricular_Activities", 3)
+        leadership = profile_slider("Leadership Positions", "Leadership_Positions", 1)
+        coding = profile_slider("Coding Skills", "Coding_Skills", 3)
+        communication = profile_slider("Communication Skills", "Communication_Skills", 3)
+        problem_solving = profile_slider("Problem Solving Skills", "Problem_Solving_Skills", 3)
+        analytical = profile_slider("Analytical Skills", "Analytical_Skills", 3)
+        teamwork = profile_slider("Teamwork Skills", "Teamwork_Skills", 3)
         
 
     # Buttons
@@ -77,6 +118,8 @@ if page == "🧾 Student Profile":
 
     with col_btn1:
         if st.button("🚀 Get Career Recommendation"):
+            import pandas as pd
+
             st.session_state.input_df = pd.DataFrame([{
                 "GPA": gpa,
                 "Field_Specific_Courses": field_courses,
@@ -103,6 +146,42 @@ if page == "🧾 Student Profile":
             st.session_state.clear()
             st.rerun()
 
+# -------------------------------------------------
+# WHAT-IF EXPLORER
+# -------------------------------------------------
+@st.fragment
+def what_if_panel(input_df):
+    """Reruns on its own, so changing its widgets does not re-render the page."""
+    from src.what_if import build_grid, score_grid
+
+    with st.expander("🔍 What-if explorer"):
+        features = st.multiselect(
+            "Vary these inputs",
+            list(FEATURE_LIMITS),
+            default=["Internships", "Coding_Skills"],
+            max_selections=4
+        )
+        max_steps = st.slider("Steps up / down", 1, 3, 1)
+
+        if not features:
+            st.info("Pick at least one input to vary.")
+            return
+
+        grid = build_grid(input_df, features, max_steps)
+        scored = score_grid(grid, features)
+
+        st.write(f"**{len(scored)} profiles scored, "
+                 f"{int(scored['Shifted'].sum())} change the top-3.**")
+
+        st.write("**Top category across variants:**")
+        st.bar_chart(scored["Top1"].value_counts())
+
+        st.dataframe(
+            scored[scored["Shifted"]].drop(columns="Shifted"),
+            hide_index=True
+        )
+
+
 # -------------------------------------------------
 # PAGE 2 — RECOMMENDATIONS
 # -------------------------------------------------
@@ -113,11 +192,16 @@ if page == "📊 Recommendations":
     else:
         input_df = st.session_state.input_df
 
-        results = predict_top_3(input_df)
+        wait_for_warm_up()
+        from src.other_interpreter import interpret_other
+        from src.prediction_cache import recommend
+
+        # predict_top_3 + recommend_fields_and_careers, cached per profile
+        results = recommend(input_df)
 
         st.subheader("📊 Top Career Recommendations")
 
-        for rank, (category, confidence) in enumerate(results, start=1):
+        for rank, (category, confidence, fields, careers) in enumerate(results, start=1):
 
             display_category = category
             if category == "Other":
@@ -128,10 +212,6 @@ if page == "📊 Recommendations":
             st.write(f"**Confidence:** {confidence}%")
 
             # 🔥 FIELD + CAREER FOR EACH CATEGORY
-            fields, careers = recommend_fields_and_careers(
-                input_df, category
-            )
-
             if fields:
                 st.write("**Recommended Fields:**")
                 for f in fields:
@@ -144,6 +224,8 @@ if page == "📊 Recommendations":
 
             st.divider()
 
+        what_if_panel(input_df)
+
         if st.button("⬅️ Back to Profile"):
             st.session_state.page = "🧾 Student Profile"
             st.rerun()
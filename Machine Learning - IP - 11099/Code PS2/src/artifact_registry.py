@@ -0,0 +1,144 @@
+import hashlib
+import os
+import threading
+import time
+
+import joblib
+
+
+def file_signature(path):
+    """Cheap change detector for an artifact file: (mtime_ns, size)."""
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def file_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def atomic_dump(obj, path):
+    """joblib.dump to a temp file and rename it over `path`.
+
+    Readers polling the registry never see a half-written pickle.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    joblib.dump(obj, tmp_path)
+    os.replace(tmp_path, path)
+
+
+class ArtifactRegistry:
+    """
+    Process-wide cache of pickled artifacts.
+
+    Every artifact is unpickled once and served from memory until its file
+    changes on disk. Files are stat'ed at most once per `check_interval`
+    seconds; when (mtime, size) moves, the content hash decides whether the
+    artifact is really reloaded. A reload builds a complete new snapshot and
+    swaps it in with a single assignment, so requests already holding the old
+    snapshot finish on it and no request sees a mix of old and new artifacts.
+    """
+
+    def __init__(self, paths, loaders=None, check_interval=1.0):
+        self.paths = dict(paths)
+        self.loaders = dict(loaders or {})
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._signatures = {}
+        self._hashes = {}
+        self._last_check = 0.0
+
+        self._stats = {
+            "cache_hits": 0,
+            "loads": 0,
+            "reloads": 0,
+            "failed_reloads": 0,
+            "load_seconds": {},
+        }
+
+    # -------------------------
+    # PUBLIC API
+    # -------------------------
+    def get(self):
+        """Return a dict {name: artifact} for the current artifact version."""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._last_check < self.check_interval:
+            self._stats["cache_hits"] += 1
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is not None and time.monotonic() - self._last_check < self.check_interval:
+                self._stats["cache_hits"] += 1
+                return self._snapshot
+            return self._refresh()
+
+    def version(self):
+        """Content hashes of the currently served artifacts."""
+        self.get()
+        return tuple(self._hashes[name] for name in sorted(self.paths))
+
+    def invalidate(self):
+        """Force the next `get` to re-check every file."""
+        self._last_check = 0.0
+
+    def stats(self):
+        stats = dict(self._stats)
+        stats["load_seconds"] = dict(self._stats["load_seconds"])
+        return stats
+
+    # -------------------------
+    # INTERNALS
+    # -------------------------
+    def _refresh(self):
+        self._last_check = time.monotonic()
+
+        changed = []
+        signatures = {}
+        for name, path in self.paths.items():
+            signatures[name] = file_signature(path)
+            if signatures[name] != self._signatures.get(name):
+                changed.append(name)
+
+        if self._snapshot is not None and not changed:
+            self._stats["cache_hits"] += 1
+            return self._snapshot
+
+        hashes = {name: file_hash(self.paths[name]) for name in changed}
+        to_load = [
+            name for name in changed
+            if self._snapshot is None or hashes[name] != self._hashes.get(name)
+        ]
+
+        snapshot = dict(self._snapshot or {})
+        try:
+            for name in to_load:
+                loader = self.loaders.get(name, joblib.load)
+                start = time.perf_counter()
+                snapshot[name] = loader(self.paths[name])
+                self._stats["load_seconds"][name] = time.perf_counter() - start
+                self._stats["loads"] += 1
+        except Exception:
+            # A writer may still be replacing the file; keep serving the old
+            # snapshot and try again on the next check.
+            if self._snapshot is None:
+                raise
+            self._stats["failed_reloads"] += 1
+            return self._snapshot
+
+        if self._snapshot is not None:
+            if to_load:
+                self._stats["reloads"] += 1
+            else:
+                self._stats["cache_hits"] += 1
+
+        self._signatures.update(signatures)
+        self._hashes.update(hashes)
+        self._snapshot = snapshot
+        return snapshot
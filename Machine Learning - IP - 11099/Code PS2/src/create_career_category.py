@@ -1,48 +1,116 @@
+import argparse
 import pandas as pd
+import numpy as np
 import os
 
+try:
+    from .recommend_field_and_career import INDEX_PATH, count_rows, merge_counts, rebuild_index
+except ImportError:  # run as a script: python src/create_career_category.py
+    from recommend_field_and_career import INDEX_PATH, count_rows, merge_counts, rebuild_index
+
 RAW_DATA_PATH = "data/raw/career_path_in_all_field.csv"
 OUTPUT_PATH = "data/raw/career_with_category.csv"
 
+DEFAULT_CATEGORY = "Other"
+
+CATEGORY_FIELDS = {
+    "Technology": ["computer science", "information technology", "software engineering"],
+    "Core Engineering": ["electronics", "mechanical", "civil", "electrical"],
+    "Management": ["management", "business", "commerce"],
+    "Healthcare": ["medicine", "pharmacy", "biotechnology", "health sciences"],
+    "Data & Analytics": ["data science", "statistics", "mathematics"],
+    "Design & Creative": ["design", "arts", "media"],
+    "Public & Legal": ["law", "public policy", "political science"],
+    "Education": ["education", "teaching", "training"],
+    "Research & Science": ["science", "research", "physics", "chemistry", "biology"],
+}
+
+FIELD_TO_CATEGORY = {
+    field: category
+    for category, fields in CATEGORY_FIELDS.items()
+    for field in fields
+}
+
+CATEGORIES = list(CATEGORY_FIELDS) + [DEFAULT_CATEGORY]
+
+
 def map_category(field):
-    field = field.lower()
-
-    if field in ["computer science", "information technology", "software engineering"]:
-        return "Technology"
-    if field in ["electronics", "mechanical", "civil", "electrical"]:
-        return "Core Engineering"
-    if field in ["management", "business", "commerce"]:
-        return "Management"
-    if field in ["medicine", "pharmacy", "biotechnology", "health sciences"]:
-        return "Healthcare"
-    if field in ["data science", "statistics", "mathematics"]:
-        return "Data & Analytics"
-    if field in ["design", "arts", "media"]:
-        return "Design & Creative"
-    if field in ["law", "public policy", "political science"]:
-        return "Public & Legal"
-    if field in ["education", "teaching", "training"]:
-        return "Education"
-    if field in ["science", "research", "physics", "chemistry", "biology"]:
-        return "Research & Science"
-
-    return "Other"
+    return FIELD_TO_CATEGORY.get(field.lower(), DEFAULT_CATEGORY)
+
+
+def label_categories(fields):
+    """
+    Career_Category for a Series of Field values.
+
+    Each distinct Field is mapped once through FIELD_TO_CATEGORY and the
+    result is broadcast to the rows through the factorized codes, so the
+    Python work depends on the number of distinct fields, not rows.
+    Missing fields are labelled DEFAULT_CATEGORY.
+    """
+    codes, uniques = pd.factorize(fields)
+
+    unique_codes = np.array(
+        [CATEGORIES.index(map_category(field)) for field in uniques] +
+        [CATEGORIES.index(DEFAULT_CATEGORY)],
+        dtype=np.int8,
+    )
+    # code -1 (missing field) picks the trailing DEFAULT_CATEGORY entry
+    category_codes = unique_codes[codes]
+
+    return pd.Series(
+        pd.Categorical.from_codes(category_codes, categories=CATEGORIES),
+        index=fields.index,
+        name="Career_Category",
+    )
+
+
+def add_career_category(df):
+    df = df.copy()
+    df["Career_Category"] = label_categories(df["Field"])
+    return df
+
+
+def label_csv(input_path, output_path, chunksize=None):
+    """
+    Add Career_Category to input_path and write it to output_path.
+
+    With a chunksize the file is streamed chunk by chunk, so memory stays
+    constant whatever the file size. Returns the (category, field, career)
+    row counts used to build the recommendation index.
+    """
+    if chunksize is None:
+        chunks = [pd.read_csv(input_path)]
+    else:
+        chunks = pd.read_csv(input_path, chunksize=chunksize)
+
+    counts = None
+    for i, chunk in enumerate(chunks):
+        chunk["Career_Category"] = label_categories(chunk["Field"])
+        chunk.to_csv(output_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        counts = merge_counts(counts, count_rows(chunk))
+
+    return counts
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Label fields with their career category")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="stream the raw CSV in chunks of this many rows")
+    args = parser.parse_args()
+
     if not os.path.exists(RAW_DATA_PATH):
         raise FileNotFoundError("Raw dataset not found")
 
-    df = pd.read_csv(RAW_DATA_PATH)
-
-    df["Career_Category"] = df["Field"].apply(map_category)
+    counts = label_csv(RAW_DATA_PATH, OUTPUT_PATH, chunksize=args.chunksize)
 
-    df.to_csv(OUTPUT_PATH, index=False)
+    # Source data changed: refresh the recommendation index built from it
+    rebuild_index(counts)
 
     print("✅ Career_Category created successfully")
     print("📁 Saved to:", OUTPUT_PATH)
+    print("📁 Recommendation index saved to:", INDEX_PATH)
     print("📊 Category distribution:")
-    print(df["Career_Category"].value_counts())
+    print(counts.groupby(level=0, observed=True).sum().sort_values(ascending=False))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,300 @@
+"""
+Compact, array-backed export of the trained career model.
+
+The exported model is a directory of .npy files plus a meta.json:
+
+    linear  (LogisticRegression)      coef, intercept
+    forest  (RandomForestClassifier)  flat node arrays of all trees, leaf class probabilities
+    boosting (HistGradientBoosting)   flat node arrays of all trees, leaf raw values, baseline
+
+Workers open the arrays with np.load(mmap_mode="r"), so every process on a
+machine shares one copy through the page cache instead of unpickling its own
+estimator. meta.json records the sha256 of the career_model.pkl it was
+exported from; load_model() only uses the export while that still matches.
+"""
+import json
+import os
+import shutil
+
+import joblib
+import numpy as np
+from scipy import sparse
+from scipy.special import expit, softmax
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+try:
+    from .artifact_registry import file_hash
+except ImportError:  # imported from a script in src/
+    from artifact_registry import file_hash
+
+COMPACT_MODEL_DIR = "models/career_model_compact"
+PARITY_TOLERANCE = 1e-6
+
+# Rows traversed at once when scoring tree ensembles
+TREE_CHUNK_ROWS = 4096
+
+
+class CompactModel:
+    """predict_proba over the exported arrays; a drop-in for the sklearn model."""
+
+    def __init__(self, kind, arrays, meta):
+        self.kind = kind
+        self.arrays = arrays
+        self.meta = meta
+        self.classes_ = arrays["classes"]
+
+    def predict_proba(self, X):
+        if self.kind == "linear":
+            return self._linear_proba(X)
+        return self._tree_proba(X)
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    # -------------------------
+    # LINEAR
+    # -------------------------
+    def _linear_proba(self, X):
+        scores = X @ self.arrays["coef"].T + self.arrays["intercept"]
+        scores = np.asarray(scores)
+        if scores.shape[1] == 1:
+            positive = expit(scores[:, 0])
+            return np.column_stack([1 - positive, positive])
+        return softmax(scores, axis=1)
+
+    # -------------------------
+    # TREES
+    # -------------------------
+    def _tree_proba(self, X):
+        chunks = []
+        for start in range(0, X.shape[0], TREE_CHUNK_ROWS):
+            chunk = X[start:start + TREE_CHUNK_ROWS]
+            if sparse.issparse(chunk):
+                chunk = chunk.toarray()
+            chunk = np.asarray(chunk, dtype=np.float64)
+            if self.kind == "forest":
+                # sklearn trees compare float32 features against the thresholds
+                chunk = chunk.astype(np.float32)
+            leaves = self._leaves(chunk)
+            chunks.append(self._forest_proba(leaves) if self.kind == "forest"
+                          else self._boosting_proba(leaves))
+        if not chunks:
+            return np.empty((0, len(self.classes_)))
+        return np.vstack(chunks)
+
+    def _leaves(self, X):
+        """Leaf node id reached by every row in every tree, shape (rows, trees)."""
+        a = self.arrays
+        node = np.broadcast_to(a["roots"], (X.shape[0], len(a["roots"]))).copy()
+
+        active = ~a["is_leaf"][node]
+        while active.any():
+            current = node[active]
+            x = X[np.nonzero(active)[0], a["feature"][current]]
+            go_left = (x <= a["threshold"][current]) | (np.isnan(x) & a["missing_left"][current])
+            node[active] = np.where(go_left, a["left"][current], a["right"][current])
+            active = ~a["is_leaf"][node]
+
+        return node
+
+    def _forest_proba(self, leaves):
+        return self.arrays["value"][leaves].mean(axis=1, dtype=np.float64)
+
+    def _boosting_proba(self, leaves):
+        a = self.arrays
+        values = a["value"][leaves]
+        raw = np.tile(a["baseline"], (leaves.shape[0], 1))
+        for k in range(raw.shape[1]):
+            raw[:, k] += values[:, a["tree_class"] == k].sum(axis=1)
+        if raw.shape[1] == 1:
+            positive = expit(raw[:, 0])
+            return np.column_stack([1 - positive, positive])
+        return softmax(raw, axis=1)
+
+
+# -------------------------
+# EXPORTERS
+# -------------------------
+def _export_linear(model):
+    return "linear", {
+        "coef": model.coef_,
+        "intercept": model.intercept_,
+    }
+
+
+def _flatten_trees(trees):
+    """Concatenate per-tree node arrays, remapping child ids to global ids."""
+    parts = {key: [] for key in ("feature", "threshold", "left", "right", "missing_left", "is_leaf", "value")}
+    roots = []
+    offset = 0
+    for tree in trees:
+        n_nodes = len(tree["feature"])
+        roots.append(offset)
+        is_leaf = tree["is_leaf"]
+        parts["feature"].append(np.where(is_leaf, 0, tree["feature"]))
+        parts["threshold"].append(tree["threshold"])
+        parts["left"].append(np.where(is_leaf, 0, tree["left"]) + offset)
+        parts["right"].append(np.where(is_leaf, 0, tree["right"]) + offset)
+        parts["missing_left"].append(tree["missing_left"])
+        parts["is_leaf"].append(is_leaf)
+        parts["value"].append(tree["value"])
+        offset += n_nodes
+
+    # int32 node ids halve the index arrays; thresholds stay float64 so every
+    # comparison is exactly the one sklearn makes
+    arrays = {key: np.concatenate(values) for key, values in parts.items()}
+    arrays["feature"] = arrays["feature"].astype(np.int32)
+    arrays["left"] = arrays["left"].astype(np.int32)
+    arrays["right"] = arrays["right"].astype(np.int32)
+    arrays["missing_left"] = arrays["missing_left"].astype(bool)
+    arrays["roots"] = np.array(roots, dtype=np.int32)
+    return arrays
+
+
+def _export_forest(model):
+    trees = []
+    for estimator in model.estimators_:
+        t = estimator.tree_
+        value = t.value[:, 0, :]
+        trees.append({
+            "feature": t.feature,
+            "threshold": t.threshold,
+            "left": t.children_left,
+            "right": t.children_right,
+            "missing_left": getattr(t, "missing_go_to_left", np.zeros(t.node_count, dtype=np.uint8)),
+            "is_leaf": t.children_left == -1,
+            "value": value / value.sum(axis=1, keepdims=True),
+        })
+    arrays = _flatten_trees(trees)
+    # class probabilities of ~millions of nodes: float32 keeps the averaged
+    # probabilities well inside PARITY_TOLERANCE
+    arrays["value"] = arrays["value"].astype(np.float32)
+    return "forest", arrays
+
+
+# Private HistGradientBoosting internals the export reads; they can change
+# between scikit-learn versions
+BOOSTING_ATTRIBUTES = ("_predictors", "_baseline_prediction", "is_categorical_")
+BOOSTING_NODE_FIELDS = ("feature_idx", "num_threshold", "left", "right",
+                        "missing_go_to_left", "is_leaf", "value")
+
+
+def _export_boosting(model):
+    missing = [name for name in BOOSTING_ATTRIBUTES if not hasattr(model, name)]
+    if missing:
+        raise ValueError(f"This scikit-learn version has no {', '.join(missing)}; "
+                         "cannot export HistGradientBoosting")
+    if model.is_categorical_ is not None and np.any(model.is_categorical_):
+        raise ValueError("Categorical splits are not supported by the compact export")
+
+    trees = []
+    tree_class = []
+    for iteration in model._predictors:
+        for k, predictor in enumerate(iteration):
+            nodes = predictor.nodes
+            missing = [name for name in BOOSTING_NODE_FIELDS if name not in (nodes.dtype.names or ())]
+            if missing:
+                raise ValueError(f"Tree nodes of this scikit-learn version lack {', '.join(missing)}")
+            trees.append({
+                "feature": nodes["feature_idx"],
+                "threshold": nodes["num_threshold"],
+                "left": nodes["left"],
+                "right": nodes["right"],
+                "missing_left": nodes["missing_go_to_left"],
+                "is_leaf": nodes["is_leaf"].astype(bool),
+                "value": nodes["value"],
+            })
+            tree_class.append(k)
+
+    arrays = _flatten_trees(trees)
+    arrays["tree_class"] = np.array(tree_class, dtype=np.intp)
+    arrays["baseline"] = np.asarray(model._baseline_prediction, dtype=np.float64).ravel()
+    return "boosting", arrays
+
+
+EXPORTERS = [
+    (LogisticRegression, _export_linear),
+    (RandomForestClassifier, _export_forest),
+    (HistGradientBoostingClassifier, _export_boosting),
+]
+
+
+def export_model(model, X_check, source_path, directory=COMPACT_MODEL_DIR, tolerance=PARITY_TOLERANCE):
+    """
+    Export `model` to `directory` and check it against the sklearn model.
+
+    `source_path` is the pickle of `model`; the export is tied to its sha256.
+
+    predict_proba of the export must match model.predict_proba on X_check
+    within `tolerance`, otherwise nothing is written and ValueError is
+    raised. Returns the largest absolute probability difference.
+    """
+    for model_type, exporter in EXPORTERS:
+        if isinstance(model, model_type):
+            break
+    else:
+        raise ValueError(f"No compact export for {type(model).__name__}")
+
+    kind, arrays = exporter(model)
+    arrays["classes"] = model.classes_
+    meta = {
+        "kind": kind,
+        "estimator": type(model).__name__,
+        "n_features": int(model.n_features_in_),
+        "source_hash": file_hash(source_path),
+    }
+
+    compact = CompactModel(kind, arrays, meta)
+    max_diff = float(np.max(np.abs(compact.predict_proba(X_check) - model.predict_proba(X_check))))
+    if max_diff > tolerance:
+        raise ValueError(
+            f"Compact {kind} export differs from {type(model).__name__} by {max_diff:.2e} "
+            f"(tolerance {tolerance:.0e})"
+        )
+
+    tmp_dir = f"{directory}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(array))
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+
+    remove_export(directory)
+    os.replace(tmp_dir, directory)
+
+    return max_diff
+
+
+def remove_export(directory=COMPACT_MODEL_DIR):
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+def load_compact_model(directory=COMPACT_MODEL_DIR):
+    with open(os.path.join(directory, "meta.json")) as f:
+        meta = json.load(f)
+    arrays = {
+        name[:-len(".npy")]: np.load(os.path.join(directory, name), mmap_mode="r")
+        for name in os.listdir(directory)
+        if name.endswith(".npy")
+    }
+    return CompactModel(meta["kind"], arrays, meta)
+
+
+def load_model(path):
+    """
+    Registry loader for career_model.pkl.
+
+    Uses the memory-mapped compact export when it was made from exactly this
+    pickle (same sha256), and unpickles the sklearn model otherwise. A
+    matching (mtime, size) alone is not trusted: a checkout or copy can give
+    a different pickle the same signature.
+    """
+    meta_path = os.path.join(COMPACT_MODEL_DIR, "meta.json")
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta["source_hash"] == file_hash(path):
+            return load_compact_model(COMPACT_MODEL_DIR)
+    return joblib.load(path)
@@ -0,0 +1,273 @@
+"""
+Stage-level timing and memory instrumentation.
+
+    with stage("pipeline.train"):
+        ...
+
+    @instrumented("predict_top_3")
+    def predict_top_3(input_df): ...
+
+Off unless INSTRUMENTATION=1 is set (or enable() is called); while off,
+stage() hands out one shared no-op context manager and instrumented
+functions call straight through. While on, every finished stage appends one
+JSON line to INSTRUMENTATION_DIR/stages.jsonl with
+
+    wall_s, cpu_s          wall clock and process CPU time
+    peak_rss_mb            process peak RSS when the stage ended
+    rss_growth_mb          how much the stage raised that peak
+    alloc_peak_mb          peak Python allocations during the stage
+                           (INSTRUMENTATION_MEMORY=tracemalloc only)
+
+and per-stage totals are written in Prometheus text format to
+INSTRUMENTATION_DIR/stages.prom at exit and at most every SNAPSHOT_INTERVAL
+seconds. tracemalloc traces every allocation and slows Python code down
+noticeably; its peaks are process-wide, so stages running at the same time
+in other threads add to each other's alloc_peak_mb.
+"""
+import atexit
+import contextlib
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+LOG_DIR = os.environ.get("INSTRUMENTATION_DIR", "logs")
+# "rss" (cheap) or "tracemalloc" (per-stage Python allocation peaks)
+MEMORY_MODE = os.environ.get("INSTRUMENTATION_MEMORY", "rss")
+SNAPSHOT_INTERVAL = 10.0
+
+MB = 1024 * 1024
+# ru_maxrss is in kilobytes on Linux and in bytes on macOS
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+_enabled = False
+_config = {"log_dir": LOG_DIR, "memory": MEMORY_MODE}
+_lock = threading.Lock()
+_local = threading.local()
+_totals = {}
+_last_snapshot = 0.0
+_NULL_STAGE = contextlib.nullcontext()
+
+
+# -------------------------
+# SWITCH
+# -------------------------
+def enable(log_dir=None, memory=None):
+    """Start recording stages (to `log_dir`, with `memory` "rss" or "tracemalloc")."""
+    global _enabled
+    memory = memory or _config["memory"]
+    if memory not in ("rss", "tracemalloc"):
+        raise ValueError(f"Unknown memory mode: {memory}")
+
+    _config["log_dir"] = log_dir or _config["log_dir"]
+    _config["memory"] = memory
+    os.makedirs(_config["log_dir"], exist_ok=True)
+    if memory == "tracemalloc" and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _enabled = True
+
+
+def disable():
+    """Stop recording and write the Prometheus snapshot of what was recorded."""
+    global _enabled
+    if _enabled:
+        write_snapshot()
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def log_path():
+    return os.path.join(_config["log_dir"], "stages.jsonl")
+
+
+def snapshot_path():
+    return os.path.join(_config["log_dir"], "stages.prom")
+
+
+# -------------------------
+# RECORDING
+# -------------------------
+def _peak_rss():
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT
+
+
+class _Stage:
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.tracing = _config["memory"] == "tracemalloc" and tracemalloc.is_tracing()
+        if self.tracing:
+            # An enclosing stage keeps the peak it reached before this one resets it
+            stack = _stack()
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                stack[-1].alloc_peak = max(stack[-1].alloc_peak, peak)
+            tracemalloc.reset_peak()
+            self.alloc_start, self.alloc_peak = current, current
+            stack.append(self)
+
+        self.rss_start = _peak_rss()
+        self.cpu_start = time.process_time()
+        self.wall_start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall_start
+        cpu = time.process_time() - self.cpu_start
+        rss = _peak_rss()
+
+        record = {
+            "ts": round(time.time(), 3),
+            "pid": os.getpid(),
+            "stage": self.name,
+            "wall_s": round(wall, 6),
+            "cpu_s": round(cpu, 6),
+            "peak_rss_mb": round(rss / MB, 1),
+            "rss_growth_mb": round((rss - self.rss_start) / MB, 1),
+        }
+        if self.labels:
+            record["labels"] = self.labels
+        alloc = None
+        if self.tracing:
+            stack = _stack()
+            stack.pop()
+            peak = max(self.alloc_peak, tracemalloc.get_traced_memory()[1])
+            if stack:
+                stack[-1].alloc_peak = max(stack[-1].alloc_peak, peak)
+            alloc = peak - self.alloc_start
+            record["alloc_peak_mb"] = round(alloc / MB, 3)
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+
+        _record(record, rss, alloc)
+        return False
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def _record(record, rss, alloc):
+    global _last_snapshot
+    key = (record["stage"], tuple(sorted(record.get("labels", {}).items())))
+
+    with _lock:
+        totals = _totals.setdefault(key, {
+            "calls": 0, "errors": 0, "wall": 0.0, "cpu": 0.0,
+            "wall_max": 0.0, "peak_rss": 0, "alloc_peak": None,
+        })
+        totals["calls"] += 1
+        totals["errors"] += "error" in record
+        totals["wall"] += record["wall_s"]
+        totals["cpu"] += record["cpu_s"]
+        totals["wall_max"] = max(totals["wall_max"], record["wall_s"])
+        totals["peak_rss"] = max(totals["peak_rss"], rss)
+        if alloc is not None:
+            totals["alloc_peak"] = max(totals["alloc_peak"] or 0, alloc)
+
+        with open(log_path(), "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+        snapshot_due = time.monotonic() - _last_snapshot >= SNAPSHOT_INTERVAL
+        if snapshot_due:
+            _last_snapshot = time.monotonic()
+
+    if snapshot_due:
+        write_snapshot()
+
+
+def stage(name, **labels):
+    """Context manager recording one run of the stage `name`."""
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name, labels)
+
+
+def instrumented(name=None):
+    """Decorator recording every call of the function as a stage."""
+    def decorate(func):
+        stage_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Stage(stage_name, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+    return decorate
+
+
+# -------------------------
+# PROMETHEUS SNAPSHOT
+# -------------------------
+METRICS = [
+    ("stage_calls_total", "counter", "Finished runs of the stage.", "calls"),
+    ("stage_errors_total", "counter", "Runs of the stage that raised.", "errors"),
+    ("stage_wall_seconds_total", "counter", "Wall clock time spent in the stage.", "wall"),
+    ("stage_cpu_seconds_total", "counter", "Process CPU time spent in the stage.", "cpu"),
+    ("stage_wall_seconds_max", "gauge", "Longest run of the stage.", "wall_max"),
+    ("stage_peak_rss_bytes", "gauge", "Process peak RSS at the end of a run.", "peak_rss"),
+    ("stage_alloc_peak_bytes", "gauge", "Largest Python allocation peak of a run.", "alloc_peak"),
+]
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text():
+    """Per-stage totals of this process in Prometheus text format."""
+    with _lock:
+        totals = {key: dict(values) for key, values in _totals.items()}
+
+    lines = []
+    for metric, kind, help_text, field in METRICS:
+        samples = []
+        for (name, labels), values in sorted(totals.items()):
+            if values[field] is None:
+                continue
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in (("stage", name), *labels))
+            samples.append(f"{metric}{{{label_text}}} {round(values[field], 6)}")
+        if samples:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}", *samples]
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def write_snapshot(path=None):
+    """Write prometheus_text() atomically to `path` (snapshot_path() by default)."""
+    path = path or snapshot_path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, "w") as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, path)
+    return path
+
+
+@atexit.register
+def _write_final_snapshot():
+    if _enabled and _totals:
+        write_snapshot()
+
+
+if os.environ.get("INSTRUMENTATION", "").lower() in ("1", "true", "yes", "on"):
+    enable()
@@ -0,0 +1,110 @@
+"""
+Load test for the local inference service (src/service.py).
+
+    python -m src.service &
+    python -m src.load_test --requests 2000 --concurrency 32
+
+Sends single-profile /predict requests taken from the raw career data over
+`concurrency` keep-alive connections and reports throughput, latency
+percentiles and the mean batch size the service formed.
+"""
+import argparse
+import asyncio
+import json
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from .scoring_plan import RAW_FEATURES
+
+RAW_DATA_PATH = "data/raw/career_path_in_all_field.csv"
+
+
+async def request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def worker(host, port, profiles, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for profile in profiles:
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, "POST", "/predict", {"profile": profile})
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def batch_stats(metrics_text):
+    """(batches, profiles) from the career_batch_size histogram in /metrics."""
+    count = re.search(r"^career_batch_size_count (\S+)$", metrics_text, re.M)
+    total = re.search(r"^career_batch_size_sum (\S+)$", metrics_text, re.M)
+    return float(count.group(1)), float(total.group(1))
+
+
+async def run(host, port, n_requests, concurrency):
+    df = pd.read_csv(RAW_DATA_PATH, usecols=RAW_FEATURES)
+    rows = df.sample(n_requests, replace=True, random_state=42).to_dict("records")
+
+    async def metrics():
+        reader, writer = await asyncio.open_connection(host, port)
+        _, body = await request(reader, writer, "GET", "/metrics")
+        writer.close()
+        return batch_stats(body.decode())
+
+    batches_before, profiles_before = await metrics()
+
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        worker(host, port, rows[i::concurrency], latencies, errors)
+        for i in range(concurrency)
+    ))
+    elapsed = time.perf_counter() - start
+
+    batches_after, profiles_after = await metrics()
+    batches = batches_after - batches_before
+    mean_batch = (profiles_after - profiles_before) / batches if batches else 0.0
+
+    latencies_ms = np.array(latencies) * 1000
+    print(f"✅ {len(latencies)} requests, {concurrency} connections, {len(errors)} errors")
+    print(f"⏱️ {len(latencies) / elapsed:,.0f} requests/s over {elapsed:.2f}s")
+    print(f"⏱️ latency p50 {np.percentile(latencies_ms, 50):.1f} ms, "
+          f"p95 {np.percentile(latencies_ms, 95):.1f} ms, "
+          f"p99 {np.percentile(latencies_ms, 99):.1f} ms")
+    print(f"📦 {batches:.0f} batches, {mean_batch:.1f} profiles per batch")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the local inference service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.host, args.port, args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,25 +1,38 @@
-def interpret_other(input_df):
+import numpy as np
+
+# Order matters: on ties the earlier profile wins, as in the original
+# tech -> research -> management if/elif chain.
+PROFILES = np.array([
+    "Interdisciplinary (Tech-Oriented Profile)",
+    "Interdisciplinary (Research-Oriented Profile)",
+    "Interdisciplinary (Management / Leadership Profile)",
+])
+
+
+def interpret_other_batch(input_df):
+    """Interpretation of every row of input_df, as an array of strings."""
     tech_score = (
-        input_df["Coding_Skills"].iloc[0] +
-        input_df["Analytical_Skills"].iloc[0] +
-        input_df["Problem_Solving_Skills"].iloc[0]
+        input_df["Coding_Skills"].to_numpy() +
+        input_df["Analytical_Skills"].to_numpy() +
+        input_df["Problem_Solving_Skills"].to_numpy()
     )
 
     soft_score = (
-        input_df["Communication_Skills"].iloc[0] +
-        input_df["Presentation_Skills"].iloc[0] +
-        input_df["Teamwork_Skills"].iloc[0] +
-        input_df["Leadership_Positions"].iloc[0]
+        input_df["Communication_Skills"].to_numpy() +
+        input_df["Presentation_Skills"].to_numpy() +
+        input_df["Teamwork_Skills"].to_numpy() +
+        input_df["Leadership_Positions"].to_numpy()
     )
 
     research_score = (
-        input_df["Research_Experience"].iloc[0] +
-        input_df["Projects"].iloc[0]
+        input_df["Research_Experience"].to_numpy() +
+        input_df["Projects"].to_numpy()
     )
 
-    if tech_score >= soft_score and tech_score >= research_score:
-        return "Interdisciplinary (Tech-Oriented Profile)"
-    elif research_score >= tech_score and research_score >= soft_score:
-        return "Interdisciplinary (Research-Oriented Profile)"
-    else:
-        return "Interdisciplinary (Management / Leadership Profile)"
+    # argmax returns the first maximum, which gives the tie-break order above
+    scores = np.stack([tech_score, research_score, soft_score], axis=1)
+    return PROFILES[np.argmax(scores, axis=1)]
+
+
+def interpret_other(input_df):
+    return str(interpret_other_batch(input_df.iloc[[0]])[0])
@@ -0,0 +1,238 @@
+"""
+Run the whole PS2 training pipeline in one process:
+
+    create_career_category -> feature_engineering_utils -> data_preprocessing -> train_model
+
+Frames are passed between stages in memory. Every stage output is cached
+under CACHE_DIR keyed by a content hash of the raw data, the source code of
+the stage and of every stage before it (each with the src modules it
+imports, directly or not), and the stage parameters, so an
+unchanged stage is never recomputed. Intermediate outputs are only written when
+asked for with --write.
+
+    python -m src.pipeline
+    python -m src.pipeline --write category,features,clean
+    python -m src.pipeline --config '{"train": {"cv": 3}}'
+"""
+import argparse
+import ast
+import glob
+import hashlib
+import inspect
+import json
+import os
+import time
+
+import joblib
+import pandas as pd
+
+from . import create_career_category, data_preprocessing, feature_engineering_utils, train_model
+from .artifact_registry import atomic_dump, file_hash
+from .instrumentation import stage
+from .recommend_field_and_career import count_rows, rebuild_index
+
+CACHE_DIR = "data/cache"
+
+DEFAULT_CONFIG = {
+    "category": {},
+    "features": {},
+    "clean": {"output_mode": "dense"},
+    "train": {"cv": 5, "n_jobs": -1},
+}
+
+
+# -------------------------
+# STAGES
+# -------------------------
+def run_category(df):
+    return create_career_category.add_career_category(df)
+
+
+def run_features(df):
+    return feature_engineering_utils.add_engineered_features(df)
+
+
+def run_clean(df, output_mode):
+    return data_preprocessing.preprocess(df, output_mode=output_mode)
+
+
+def run_train(preprocessed, cv, n_jobs):
+    X, y, _, _, _ = preprocessed
+    return train_model.select_best_model(X, y, cv=cv, n_jobs=n_jobs)
+
+
+STAGES = [
+    ("category", run_category, create_career_category),
+    ("features", run_features, feature_engineering_utils),
+    ("clean", run_clean, data_preprocessing),
+    ("train", run_train, train_model),
+]
+
+# --write <name> saves the output of that stage where the standalone script would
+OUTPUT_WRITERS = {
+    "category": lambda df: df.to_csv(create_career_category.OUTPUT_PATH, index=False),
+    "features": lambda df: df.to_csv(feature_engineering_utils.OUTPUT_PATH, index=False),
+    "clean": lambda out: data_preprocessing.save_processed(*out[:3]),
+}
+
+
+# -------------------------
+# CACHE
+# -------------------------
+def _local_imports(path, source):
+    """Paths of the modules next to `path` that its source imports."""
+    names = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split(".")[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level <= 1:
+            if node.module:
+                names.add(node.module.split(".")[0])
+            else:
+                # from . import x
+                names.update(alias.name for alias in node.names)
+
+    src_dir = os.path.dirname(path)
+    paths = (os.path.join(src_dir, f"{name}.py") for name in names)
+    return [p for p in paths if os.path.exists(p)]
+
+
+def _module_hash(module):
+    """Hash of the module's source and of every src module it imports."""
+    pending = [inspect.getsourcefile(module)]
+    sources = {}
+    while pending:
+        path = pending.pop()
+        if path in sources:
+            continue
+        with open(path, "rb") as f:
+            sources[path] = f.read()
+        pending += _local_imports(path, sources[path])
+
+    digest = hashlib.sha256()
+    for path in sorted(sources):
+        digest.update(os.path.basename(path).encode())
+        digest.update(hashlib.sha256(sources[path]).digest())
+    return digest.hexdigest()
+
+
+def stage_keys(raw_path, config):
+    """Cache key of every stage: hash of its input key, its code and its params."""
+    keys = {}
+    key = file_hash(raw_path)
+    for name, _, module in STAGES:
+        payload = json.dumps([key, _module_hash(module), config[name]], sort_keys=True)
+        key = hashlib.sha256(payload.encode()).hexdigest()
+        keys[name] = key
+    return keys
+
+
+def _cache_path(name, key):
+    return os.path.join(CACHE_DIR, f"{name}-{key[:16]}.pkl")
+
+
+def _store(name, key, output):
+    # Only the latest output of each stage is kept
+    for old_path in glob.glob(os.path.join(CACHE_DIR, f"{name}-*.pkl")):
+        os.remove(old_path)
+    atomic_dump(output, _cache_path(name, key))
+
+
+# -------------------------
+# RUNNER
+# -------------------------
+def run_pipeline(raw_path=create_career_category.RAW_DATA_PATH, config=None, write=()):
+    """
+    Run (or reuse) every stage and save the model artifacts.
+
+    Stages are resumed from the latest one whose cached output matches its
+    key; stages whose output is needed for --write are loaded from cache too.
+    Returns {stage: "cached" | seconds taken}.
+    """
+    config = {name: {**DEFAULT_CONFIG[name], **(config or {}).get(name, {})}
+              for name in DEFAULT_CONFIG}
+    keys = stage_keys(raw_path, config)
+    names = [name for name, _, _ in STAGES]
+
+    # Latest stage with a valid cached output; everything before it is skipped
+    start = 0
+    for i in reversed(range(len(STAGES))):
+        if os.path.exists(_cache_path(names[i], keys[names[i]])):
+            start = i + 1
+            break
+
+    outputs = {}
+    timings = {}
+    for i, (name, func, _) in enumerate(STAGES):
+        # Cached outputs are only loaded if a later stage, --write or the
+        # final artifacts need them
+        needed = i == start - 1 or name in write or name in ("clean", "train")
+        if i < start:
+            if needed:
+                with stage(f"pipeline.{name}", cached="true"):
+                    outputs[name] = joblib.load(_cache_path(name, keys[name]))
+            timings[name] = "cached"
+            continue
+
+        if i:
+            stage_input = outputs[names[i - 1]]
+        else:
+            with stage("pipeline.read_raw"):
+                stage_input = pd.read_csv(raw_path)
+        t0 = time.perf_counter()
+        with stage(f"pipeline.{name}", cached="false"):
+            outputs[name] = func(stage_input, **config[name])
+        timings[name] = time.perf_counter() - t0
+        _store(name, keys[name], outputs[name])
+
+    with stage("pipeline.save"):
+        for name in write:
+            OUTPUT_WRITERS[name](outputs[name])
+
+        _, _, _, preprocessor, label_encoder = outputs["clean"]
+        data_preprocessing.save_artifacts(preprocessor, label_encoder)
+        train_model.save_model(outputs["train"], X_check=outputs["clean"][0])
+
+        if "category" in write:
+            rebuild_index(count_rows(outputs["category"]))
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the PS2 training pipeline in memory")
+    parser.add_argument("--raw", default=create_career_category.RAW_DATA_PATH,
+                        help="raw career CSV")
+    parser.add_argument("--write", default="",
+                        help="comma separated stage outputs to save: "
+                             + ",".join(OUTPUT_WRITERS))
+    parser.add_argument("--config", default=None,
+                        help="JSON string or file overriding stage parameters")
+    args = parser.parse_args()
+
+    config = None
+    if args.config:
+        if os.path.exists(args.config):
+            with open(args.config) as f:
+                config = json.load(f)
+        else:
+            config = json.loads(args.config)
+
+    write = [name for name in args.write.split(",") if name]
+    unknown = set(write) - set(OUTPUT_WRITERS)
+    if unknown:
+        parser.error(f"unknown --write outputs: {', '.join(sorted(unknown))}")
+
+    timings = run_pipeline(args.raw, config=config, write=write)
+
+    print("\n✅ Pipeline completed")
+    for name, timing in timings.items():
+        shown = timing if timing == "cached" else f"{timing:.2f}s"
+        print(f"   {name:<10} {shown}")
+    print(f"📁 Model path: {train_model.MODEL_PATH}")
+    for name in write:
+        print(f"📁 Saved {name} output")
+
+
+if __name__ == "__main__":
+    main()
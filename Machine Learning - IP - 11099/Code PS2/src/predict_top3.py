@@ -1,22 +1,64 @@
-import joblib
+import argparse
+
 import numpy as np
+import pandas as pd
+from .artifact_registry import ArtifactRegistry
+from .export_model import load_model
 from .feature_engineering_utils import add_engineered_features
+from .instrumentation import instrumented
+from .scoring_plan import RAW_FEATURES, build_plan
 
 MODEL_PATH = "models/career_model.pkl"
 PREPROCESSOR_PATH = "models/preprocessor.pkl"
 LABEL_ENCODER_PATH = "models/label_encoder.pkl"
 
 
+# Loaded once per process, reloaded when train_model.py / data_preprocessing.py
+# write new artifacts. The model comes from its memory-mapped compact export
+# when one matches career_model.pkl.
+registry = ArtifactRegistry({
+    "model": MODEL_PATH,
+    "preprocessor": PREPROCESSOR_PATH,
+    "label_encoder": LABEL_ENCODER_PATH,
+}, loaders={"model": load_model})
+
+# (snapshot, plan) for the artifacts the registry currently serves
+_plan = (None, None)
+
+
 def load_artifacts():
-    model = joblib.load(MODEL_PATH)
-    preprocessor = joblib.load(PREPROCESSOR_PATH)
-    label_encoder = joblib.load(LABEL_ENCODER_PATH)
-    return model, preprocessor, label_encoder
+    artifacts = registry.get()
+    return artifacts["model"], artifacts["preprocessor"], artifacts["label_encoder"]
 
 
-def predict_top_3(input_df):
-    model, preprocessor, label_encoder = load_artifacts()
+def artifact_stats():
+    """Load times and cache hit counts of the shared artifact registry."""
+    return registry.stats()
+
+
+def get_scoring_plan(snapshot=None):
+    """
+    ScoringPlan of the current artifacts (or of `snapshot`), rebuilt when
+    the registry reloads; None when they have no plan, e.g. a preprocessor
+    with categorical columns.
+    """
+    global _plan
+    snapshot = snapshot or registry.get()
+    if _plan[0] is not snapshot:
+        plan = build_plan(snapshot["model"], snapshot["preprocessor"], snapshot["label_encoder"])
+        _plan = (snapshot, plan)
+    return _plan[1]
+
 
+def predict_top_3_profile(profile):
+    """predict_top_3 for one profile given as a dict (or array in RAW_FEATURES order)."""
+    plan = get_scoring_plan()
+    if plan is None:
+        return predict_top_3(pd.DataFrame([profile], columns=RAW_FEATURES))
+    return plan.top_k(profile, k=3)
+
+
+def prepare_features(input_df):
     # ✅ APPLY SAME FEATURE ENGINEERING AS TRAINING
     input_df = add_engineered_features(input_df)
 
@@ -26,19 +68,95 @@ def predict_top_3(input_df):
     if cols_to_drop:
         input_df = input_df.drop(columns=cols_to_drop)
 
-    # ✅ PREPROCESS
-    X_processed = preprocessor.transform(input_df)
+    return input_df
+
+
+def predict_proba(input_df, model, preprocessor, plan=None):
+    """
+    Class probabilities of every row of input_df.
+
+    Scored by `plan` when there is one and input_df has every raw input,
+    otherwise by the preprocessor and model; both give the same values.
+    """
+    if plan is not None and all(f in input_df.columns for f in RAW_FEATURES):
+        return np.atleast_2d(plan.predict_proba(input_df[RAW_FEATURES].to_numpy(dtype=np.float64)))
+
+    # ✅ PREPROCESS + PROBABILITIES FOR ALL ROWS IN ONE CALL
+    X_processed = preprocessor.transform(prepare_features(input_df))
+    return model.predict_proba(X_processed)
+
+
+@instrumented("predict_top_k")
+def predict_top_k(input_df, k=3):
+    """
+    Score every row of input_df and return its k most likely categories.
+
+    Returns (categories, confidences): two N x k arrays ordered by descending
+    probability, confidences in percent rounded to 2 decimals.
+    """
+    snapshot = registry.get()
+    probabilities = predict_proba(
+        input_df, snapshot["model"], snapshot["preprocessor"], get_scoring_plan(snapshot)
+    )
+    label_encoder = snapshot["label_encoder"]
+
+    # ✅ TOP-K: partial sort of the whole matrix, then order the k survivors
+    k = min(k, probabilities.shape[1])
+    top_indices = np.argpartition(-probabilities, k - 1, axis=1)[:, :k]
+    top_probs = np.take_along_axis(probabilities, top_indices, axis=1)
+
+    order = np.argsort(-top_probs, axis=1, kind="stable")
+    top_indices = np.take_along_axis(top_indices, order, axis=1)
+    top_probs = np.take_along_axis(top_probs, order, axis=1)
+
+    # ✅ DECODE ALL LABELS WITH ONE LOOKUP
+    categories = label_encoder.classes_[top_indices]
+    confidences = np.round(top_probs * 100, 2)
+
+    return categories, confidences
+
+
+@instrumented("predict_top_3")
+def predict_top_3(input_df):
+    categories, confidences = predict_top_k(input_df, k=3)
+    return list(zip(categories[0], confidences[0]))
+
+
+def top_k_frame(categories, confidences):
+    columns = {}
+    for rank in range(categories.shape[1]):
+        columns[f"Top{rank + 1}_Category"] = categories[:, rank]
+        columns[f"Top{rank + 1}_Confidence"] = confidences[:, rank]
+    return pd.DataFrame(columns)
+
+
+def score_csv(input_path, output_path, k=3, chunksize=50_000):
+    """Stream a CSV of student profiles through predict_top_k chunk by chunk.
+
+    Only one chunk of input and output is held in memory at a time.
+    """
+    rows = 0
+    for i, chunk in enumerate(pd.read_csv(input_path, chunksize=chunksize)):
+        categories, confidences = predict_top_k(chunk, k=k)
+        result = top_k_frame(categories, confidences)
+        result.to_csv(output_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        rows += len(result)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch top-k career category scoring")
+    parser.add_argument("input", help="CSV of student profiles")
+    parser.add_argument("output", help="CSV to write the top-k predictions to")
+    parser.add_argument("-k", type=int, default=3, help="categories per student")
+    parser.add_argument("--chunksize", type=int, default=50_000, help="rows scored per batch")
+    args = parser.parse_args()
 
-    # ✅ PROBABILITIES
-    probabilities = model.predict_proba(X_processed)[0]
+    rows = score_csv(args.input, args.output, k=args.k, chunksize=args.chunksize)
 
-    # ✅ TOP-3
-    top_indices = np.argsort(probabilities)[::-1][:3]
+    print(f"✅ Scored {rows} rows")
+    print("📁 Saved to:", args.output)
 
-    results = []
-    for idx in top_indices:
-        category = label_encoder.inverse_transform([idx])[0]
-        confidence = round(probabilities[idx] * 100, 2)
-        results.append((category, confidence))
 
-    return results
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""
+Memoized recommendations per student profile.
+
+Every input of app.py comes from a slider (skills 0-5, GPA in 0.1 steps),
+so the same profiles come back again and again across sessions. The top-3
+categories of a profile, with the fields and careers of each, are kept in a
+bounded LRU cache keyed on the canonical profile tuple.
+
+The cache is emptied when the served artifacts (model, preprocessor,
+label encoder) or the recommendation data change. With
+PREDICTION_CACHE_PERSIST=1 it is saved to CACHE_PATH every SAVE_EVERY new
+entries and at exit, and loaded back on first use when the artifacts still
+match.
+
+    python -m src.prediction_cache     # size and hit rate of the saved cache
+"""
+import atexit
+import math
+import os
+import threading
+from collections import OrderedDict
+
+import joblib
+
+from .artifact_registry import atomic_dump, file_signature
+from .predict_top3 import predict_top_3, registry
+from .recommend_field_and_career import DATA_PATH, recommend_fields_and_careers
+from .scoring_plan import RAW_FEATURES
+
+CACHE_PATH = "models/prediction_cache.pkl"
+PERSIST = os.environ.get("PREDICTION_CACHE_PERSIST", "").lower() in ("1", "true", "yes", "on")
+MAX_ENTRIES = 4096
+SAVE_EVERY = 50
+# Inputs equal to this many decimals share an entry
+KEY_DECIMALS = 6
+
+
+def profile_key(profile):
+    """
+    Canonical tuple of a profile (dict, Series or one-row DataFrame).
+
+    Values follow RAW_FEATURES order as floats rounded to KEY_DECIMALS, so
+    7.5, 7.50 and 15/2 or 3 and 3.0 give the same key; missing values are
+    None.
+    """
+    if hasattr(profile, "columns"):
+        # cheaper than profile.iloc[0] for a one-row frame
+        profile = dict(zip(profile.columns, profile.to_numpy()[0]))
+
+    key = []
+    for feature in RAW_FEATURES:
+        value = profile[feature]
+        if value is None or math.isnan(float(value)):
+            key.append(None)
+        else:
+            key.append(round(float(value), KEY_DECIMALS))
+    return tuple(key)
+
+
+class PredictionCache:
+    """
+    Thread-safe LRU cache of `compute(profile)` keyed on profile_key().
+
+    `version()` names the data the results depend on; the cache empties
+    itself whenever it changes. Holds at most `max_entries` results and
+    counts hits, misses and evictions; lookups with count=False (the
+    warm-up) fill the cache without counting as hits or misses.
+    """
+
+    def __init__(self, compute, version, max_entries=MAX_ENTRIES, path=None, save_every=SAVE_EVERY):
+        self.compute = compute
+        self.version = version
+        self.max_entries = max_entries
+        self.path = path
+        self.save_every = save_every
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._version = None
+        self._loaded = path is None
+        self._unsaved = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, profile, count=True):
+        key = profile_key(profile)
+        version = self.version()
+
+        with self._lock:
+            if not self._loaded:
+                self._load(version)
+            if version != self._version:
+                if self._entries:
+                    self._stats["invalidations"] += 1
+                self._entries.clear()
+                self._version = version
+
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += count
+                return self._entries[key]
+            self._stats["misses"] += count
+
+        # Computed outside the lock; two threads may compute the same profile
+        value = self.compute(profile)
+
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._stats["evictions"] += 1
+                self._unsaved += 1
+            save_due = self.path is not None and self._unsaved >= self.save_every
+
+        if save_due:
+            self.save()
+        return value
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # -------------------------
+    # PERSISTENCE
+    # -------------------------
+    def save(self, path=None):
+        path = path or self.path
+        with self._lock:
+            state = {"version": self._version, "entries": list(self._entries.items()),
+                     "stats": dict(self._stats)}
+            self._unsaved = 0
+        atomic_dump(state, path)
+
+    def _load(self, version):
+        # Called with the lock held, on the first lookup
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return
+        try:
+            state = joblib.load(self.path)
+        except Exception:
+            return  # unreadable: start empty, it is overwritten on the next save
+        if state["version"] == version:
+            self._entries = OrderedDict(state["entries"][-self.max_entries:])
+            self._version = version
+            # hit counts carry on across restarts
+            self._stats.update(state["stats"])
+
+
+# -------------------------
+# APP CACHE
+# -------------------------
+def _data_version():
+    """Artifact content hashes and the signature of the recommendation data."""
+    return registry.version(), file_signature(DATA_PATH)
+
+
+def _recommend(input_df):
+    results = []
+    for category, confidence in predict_top_3(input_df):
+        fields, careers = recommend_fields_and_careers(input_df, category)
+        results.append((category, confidence, fields, careers))
+    return results
+
+
+recommendation_cache = PredictionCache(
+    _recommend, _data_version, path=CACHE_PATH if PERSIST else None
+)
+
+
+def recommend(input_df, count=True):
+    """
+    [(category, confidence, fields, careers)] for the top-3 categories of a
+    one-row profile, as predict_top_3 and recommend_fields_and_careers give
+    them; served from recommendation_cache. count=False leaves the hit and
+    miss counts alone.
+    """
+    return recommendation_cache.get(input_df, count)
+
+
+def cache_stats():
+    """
+    Hits, misses, hit rate, size, evictions and invalidations of the app
+    cache; counted since the first save when the cache is persisted.
+    """
+    return recommendation_cache.stats()
+
+
+@atexit.register
+def _save_at_exit():
+    if recommendation_cache.path is not None and recommendation_cache.stats()["size"]:
+        recommendation_cache.save()
+
+
+def main():
+    if not os.path.exists(CACHE_PATH):
+        print(f"⚠️ No saved cache at {CACHE_PATH} (run the app with PREDICTION_CACHE_PERSIST=1)")
+        return
+
+    state = joblib.load(CACHE_PATH)
+    stats = state["stats"]
+    lookups = stats["hits"] + stats["misses"]
+    current = state["version"] == _data_version()
+
+    print(f"📁 {CACHE_PATH}: {len(state['entries'])} profiles "
+          f"({'current' if current else 'stale, will be discarded'})")
+    print(f"📌 Hits {stats['hits']}, misses {stats['misses']}, "
+          f"hit rate {stats['hits'] / lookups if lookups else 0.0:.1%}, "
+          f"evictions {stats['evictions']}")
+
+
+if __name__ == "__main__":
+    main()
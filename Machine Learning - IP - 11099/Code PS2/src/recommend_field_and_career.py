@@ -1,43 +1,168 @@
+import os
+import threading
+
+import joblib
+import numpy as np
 import pandas as pd
 
+try:
+    from .artifact_registry import atomic_dump, file_hash, file_signature
+    from .instrumentation import instrumented
+except ImportError:  # imported from a script in src/
+    from artifact_registry import atomic_dump, file_hash, file_signature
+    from instrumentation import instrumented
+
 DATA_PATH = "data/raw/career_with_category.csv"
+INDEX_PATH = "models/recommendation_index.pkl"
+
+_index_lock = threading.Lock()
+_index = None
+_source_signature = None
+
+
+INDEX_COLUMNS = ["Career_Category", "Field", "Career"]
+
+
+def count_rows(df):
+    """Row counts per (category, field, career), in order of first appearance."""
+    return df.groupby(INDEX_COLUMNS, sort=False, observed=True, dropna=False).size()
+
+
+def merge_counts(counts, more_counts):
+    """Add the counts of a later chunk of the same file."""
+    if counts is None:
+        return more_counts
+    return (
+        pd.concat([counts, more_counts])
+        .groupby(level=[0, 1, 2], sort=False, observed=True, dropna=False)
+        .sum()
+    )
+
+
+def _ranked(counts):
+    """Keys by descending count, ties in first-appearance order (as value_counts)."""
+    counts = counts[counts.index.notna()]
+    return counts.sort_values(ascending=False, kind="stable").index.tolist()
+
+
+def build_index(counts):
+    """
+    Precompute every answer recommend_fields_and_careers can give.
+
+    Takes the output of count_rows and returns {category: (fields, careers_by_n)}
+    where `fields` lists the category's fields by descending frequency and
+    careers_by_n[n] lists the careers of the top-n fields by descending
+    frequency.
+
+    The career counts and first appearances of the top-n fields are running
+    sums and minimums over the ranked fields, so each category is counted
+    once rather than regrouped for every n.
+    """
+    index = {}
+    for category, cat_counts in counts.groupby(level=0, sort=False, observed=True):
+        cat_counts = cat_counts.droplevel(0)
+        fields = _ranked(cat_counts.groupby(level=0, sort=False, observed=True).sum())
+
+        # Missing fields are never selected and missing careers never listed
+        field_level = cat_counts.index.get_level_values(0)
+        career_level = cat_counts.index.get_level_values(1)
+        rows = np.flatnonzero(field_level.notna() & career_level.notna())
+        field_rank = pd.Index(fields).get_indexer(field_level[rows])
+        career_codes, careers = pd.factorize(career_level[rows])
+
+        # [field rank, career]: row count and position of the first row
+        totals = np.zeros((len(fields), len(careers)), dtype=np.int64)
+        np.add.at(totals, (field_rank, career_codes), cat_counts.to_numpy()[rows])
+        first_row = np.full((len(fields), len(careers)), len(cat_counts))
+        np.minimum.at(first_row, (field_rank, career_codes), rows)
+        totals = totals.cumsum(axis=0)
+        first_row = np.minimum.accumulate(first_row, axis=0)
+
+        careers_by_n = {}
+        for n in range(1, len(fields) + 1):
+            present = np.flatnonzero(first_row[n - 1] < len(cat_counts))
+            # descending count, ties in first-appearance order (as _ranked)
+            order = np.lexsort((first_row[n - 1, present], -totals[n - 1, present]))
+            careers_by_n[n] = careers[present[order]].tolist()
+
+        index[category] = (fields, careers_by_n)
 
+    return index
 
+
+def rebuild_index(counts=None, chunksize=100_000):
+    """Build the index from DATA_PATH and save it.
+
+    `counts` may be passed by a caller that has just counted the rows of
+    DATA_PATH while writing it; otherwise the CSV is read in chunks.
+    """
+    global _index, _source_signature
+
+    with _index_lock:
+        signature = file_signature(DATA_PATH)
+        if counts is None:
+            for chunk in pd.read_csv(DATA_PATH, usecols=INDEX_COLUMNS, chunksize=chunksize):
+                counts = merge_counts(counts, count_rows(chunk))
+
+        index = build_index(counts)
+        atomic_dump({"source_hash": file_hash(DATA_PATH), "index": index}, INDEX_PATH)
+
+        _index, _source_signature = index, signature
+        return index
+
+
+def load_index():
+    """
+    Return the recommendation index, loading it on first use.
+
+    The saved index is reused while the hash of DATA_PATH it was built from
+    still matches; otherwise it is rebuilt from the CSV.
+    """
+    global _index, _source_signature
+
+    signature = file_signature(DATA_PATH)
+    if _index is not None and signature == _source_signature:
+        return _index
+
+    with _index_lock:
+        if _index is not None and signature == _source_signature:
+            return _index
+
+        index = None
+        if os.path.exists(INDEX_PATH):
+            saved = joblib.load(INDEX_PATH)
+            if saved["source_hash"] == file_hash(DATA_PATH):
+                index = saved["index"]
+
+        if index is not None:
+            _index, _source_signature = index, signature
+            return index
+
+    return rebuild_index()
+
+
+@instrumented("recommend_fields_and_careers")
 def recommend_fields_and_careers(input_df, predicted_category, top_n_fields=2, top_n_careers=3):
     """
     Returns top fields and careers based on predicted category
     """
 
-    df = pd.read_csv(DATA_PATH)
-
-    # Filter by predicted career category
-    df_cat = df[df["Career_Category"] == predicted_category]
+    entry = load_index().get(predicted_category)
 
-    if df_cat.empty:
+    if entry is None:
         return [], []
 
+    fields, careers_by_n = entry
+
     # -------------------------
     # FIELD RECOMMENDATION
     # -------------------------
-    top_fields = (
-        df_cat["Field"]
-        .value_counts()
-        .head(top_n_fields)
-        .index
-        .tolist()
-    )
+    n_fields = min(max(top_n_fields, 0), len(fields))
+    top_fields = fields[:n_fields]
 
     # -------------------------
     # CAREER RECOMMENDATION
     # -------------------------
-    df_field = df_cat[df_cat["Field"].isin(top_fields)]
-
-    top_careers = (
-        df_field["Career"]
-        .value_counts()
-        .head(top_n_careers)
-        .index
-        .tolist()
-    )
+    top_careers = careers_by_n.get(n_fields, [])[:max(top_n_careers, 0)]
 
     return top_fields, top_careers
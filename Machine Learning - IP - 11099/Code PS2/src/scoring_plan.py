@@ -0,0 +1,254 @@
+"""
+Compiled single-profile scoring.
+
+predict_top_3 sends one profile through add_engineered_features, a column
+drop, ColumnTransformer.transform and predict_proba - mostly pandas and
+sklearn dispatch overhead for 15 numbers. A ScoringPlan folds the same steps
+into plain arrays built once from the fitted artifacts:
+
+    engineered features   all linear in the raw inputs -> matrix M
+    median imputation     only needed when an input is NaN
+    standard scaling      (M x - mean) / scale  -> raw @ A + c
+    linear model          folded into A and c as well, so the whole
+                          profile -> class scores path is one small matmul
+
+Other models get the scaled feature vector and run their own predict_proba.
+predict_top3 scores with the plan of the served artifacts whenever
+build_plan() gives one, and with the sklearn pipeline otherwise (e.g. a
+preprocessor with categorical columns).
+
+    python -m src.scoring_plan     # parity and dispatch checks + latency
+"""
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import LabelEncoder
+
+from .export_model import CompactModel
+from .feature_engineering_utils import add_engineered_features
+
+# Inputs of a student profile, in the order plans take them as arrays
+RAW_FEATURES = [
+    "GPA",
+    "Extracurricular_Activities",
+    "Internships",
+    "Projects",
+    "Leadership_Positions",
+    "Field_Specific_Courses",
+    "Research_Experience",
+    "Coding_Skills",
+    "Communication_Skills",
+    "Problem_Solving_Skills",
+    "Teamwork_Skills",
+    "Analytical_Skills",
+    "Presentation_Skills",
+    "Networking_Skills",
+    "Industry_Certifications",
+]
+
+PARITY_TOLERANCE = 1e-6
+
+
+def engineering_matrix(feature_names):
+    """
+    Matrix M with features = M @ raw for every name in feature_names.
+
+    Derived by running add_engineered_features on unit profiles, so it
+    always follows the formulas used in training; non-linear formulas are
+    rejected.
+    """
+    basis = pd.DataFrame(np.vstack([np.zeros(len(RAW_FEATURES)), np.eye(len(RAW_FEATURES))]),
+                         columns=RAW_FEATURES)
+    engineered = add_engineered_features(basis)[feature_names].to_numpy(dtype=np.float64)
+    offset = engineered[0]
+    matrix = (engineered[1:] - offset).T
+
+    probe = np.random.default_rng(0).uniform(0, 10, size=(8, len(RAW_FEATURES)))
+    expected = add_engineered_features(pd.DataFrame(probe, columns=RAW_FEATURES))[feature_names]
+    if np.any(offset != 0) or not np.allclose(probe @ matrix.T, expected.to_numpy()):
+        raise ValueError("Engineered features are not linear in the raw inputs")
+
+    return matrix
+
+
+class ScoringPlan:
+    def __init__(self, model, preprocessor, label_encoder):
+        numeric_cols, num_pipeline = self._numeric_block(preprocessor)
+        steps = num_pipeline.named_steps
+
+        imputer = steps["imputer"]
+        scaler = steps["scaler"]
+        n = len(numeric_cols)
+        mean = scaler.mean_ if scaler.mean_ is not None and scaler.with_mean else np.zeros(n)
+        scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n)
+
+        matrix = engineering_matrix(numeric_cols)
+        self.medians = np.asarray(imputer.statistics_, dtype=np.float64)
+        self.uses_input = matrix != 0
+        self.float32 = "float32" in steps
+
+        # scaled features = raw @ A + c
+        self.A = matrix.T / scale
+        self.c = -mean / scale
+        self.mean, self.scale, self.matrix = mean, scale, matrix
+
+        self.model = model
+        self.classes = label_encoder.classes_
+        self.linear = self.fused = None
+        coef, intercept = self._linear_params(model)
+        if coef is not None:
+            self.linear = (coef.T, intercept)
+            if not self.float32:
+                # class scores = raw @ (A W^T) + (c W^T + b)
+                self.fused = (self.A @ coef.T, self.c @ coef.T + intercept)
+
+    @staticmethod
+    def _numeric_block(preprocessor):
+        blocks = {name: (transformer, cols) for name, transformer, cols in preprocessor.transformers_}
+        if set(blocks) - {"num", "cat", "remainder"} or len(blocks.get("cat", (None, []))[1]):
+            raise ValueError("Scoring plans only support numeric-only preprocessors")
+        if "remainder" in blocks and blocks["remainder"][0] != "drop":
+            raise ValueError("Scoring plans only support numeric-only preprocessors")
+        pipeline, numeric_cols = blocks["num"]
+        if set(pipeline.named_steps) - {"imputer", "scaler", "float32"}:
+            raise ValueError(f"Unsupported numeric steps: {list(pipeline.named_steps)}")
+        return list(numeric_cols), pipeline
+
+    @staticmethod
+    def _linear_params(model):
+        if isinstance(model, LogisticRegression):
+            return model.coef_, model.intercept_
+        if isinstance(model, CompactModel) and model.kind == "linear":
+            return np.asarray(model.arrays["coef"]), np.asarray(model.arrays["intercept"])
+        return None, None
+
+    # -------------------------
+    # SCORING
+    # -------------------------
+    def as_array(self, profile):
+        if isinstance(profile, dict):
+            return np.fromiter((profile[f] for f in RAW_FEATURES), np.float64, len(RAW_FEATURES))
+        return np.asarray(profile, dtype=np.float64)
+
+    def features(self, raw):
+        """Scaled model input for one raw profile (or a 2-D block of them)."""
+        if np.isnan(raw).any():
+            missing = (np.isnan(raw)[..., None, :] & self.uses_input).any(axis=-1)
+            features = np.nan_to_num(raw) @ self.matrix.T
+            features = np.where(missing, self.medians, features)
+            features = (features - self.mean) / self.scale
+        else:
+            features = raw @ self.A + self.c
+        return features.astype(np.float32) if self.float32 else features
+
+    def predict_proba(self, profile):
+        raw = self.as_array(profile)
+        if self.linear is None:
+            features = np.atleast_2d(self.features(raw))
+            return self.model.predict_proba(features)[0 if raw.ndim == 1 else slice(None)]
+
+        if self.fused is not None and not np.isnan(raw).any():
+            scores = raw @ self.fused[0] + self.fused[1]
+        else:
+            scores = self.features(raw) @ self.linear[0] + self.linear[1]
+
+        if scores.shape[-1] == 1:
+            positive = 1 / (1 + np.exp(-scores[..., 0]))
+            return np.stack([1 - positive, positive], axis=-1)
+        scores = np.exp(scores - scores.max(axis=-1, keepdims=True))
+        return scores / scores.sum(axis=-1, keepdims=True)
+
+    def top_k(self, profile, k=3):
+        """[(category, confidence %), ...] for one profile, like predict_top_3."""
+        probabilities = self.predict_proba(profile)
+        top = np.argsort(probabilities)[::-1][:k]
+        return [(self.classes[i], round(float(probabilities[i]) * 100, 2)) for i in top]
+
+
+def build_plan(model, preprocessor, label_encoder):
+    """ScoringPlan of the artifacts, or None when they cannot be compiled into one."""
+    try:
+        return ScoringPlan(model, preprocessor, label_encoder)
+    except (ValueError, KeyError):
+        # KeyError: a numeric column that add_engineered_features does not produce
+        return None
+
+
+def check_parity(plan, df, predict_proba_fn, tolerance=PARITY_TOLERANCE):
+    """Largest |Δp| between the plan and predict_proba_fn(df) over all rows."""
+    expected = predict_proba_fn(df)
+    actual = np.vstack([plan.predict_proba(row) for row in df[RAW_FEATURES].to_numpy()])
+    max_diff = float(np.max(np.abs(actual - expected)))
+    if max_diff > tolerance:
+        raise AssertionError(f"Scoring plan differs from the pandas path by {max_diff:.2e}")
+    return max_diff
+
+
+def check_dispatch(df):
+    """
+    predict_top3 must score the served numeric-only artifacts with their
+    plan and fall back to the pipeline for a categorical preprocessor.
+    """
+    from .data_preprocessing import build_preprocessor
+    from .predict_top3 import get_scoring_plan, predict_proba, predict_top_k, prepare_features
+
+    plan = get_scoring_plan()
+    if plan is None:
+        raise AssertionError("The served artifacts have no scoring plan")
+    categories, _ = predict_top_k(df.head(1))
+    if list(categories[0]) != [category for category, _ in plan.top_k(df[RAW_FEATURES].iloc[0].to_dict())]:
+        raise AssertionError("predict_top_k does not follow the scoring plan")
+
+    # the same features plus one categorical column
+    X = prepare_features(df.drop(columns=["Career_Category"], errors="ignore"))
+    X["Campus"] = pd.Series(np.where(np.arange(len(X)) % 2, "north", "south"), dtype=object)
+    y = np.arange(len(X)) % 3
+    preprocessor, _, _ = build_preprocessor(X)
+    model = LogisticRegression(max_iter=200).fit(preprocessor.fit_transform(X), y)
+    label_encoder = LabelEncoder().fit(["a", "b", "c"])
+    if build_plan(model, preprocessor, label_encoder) is not None:
+        raise AssertionError("A categorical preprocessor got a scoring plan")
+
+    expected = model.predict_proba(preprocessor.transform(X))
+    actual = predict_proba(X, model, preprocessor, None)
+    if not np.array_equal(actual, expected):
+        raise AssertionError("The pipeline fallback differs from the pipeline")
+
+
+def main():
+    from .predict_top3 import get_scoring_plan, load_artifacts, predict_top_3, prepare_features
+
+    df = pd.read_csv("data/raw/career_path_in_all_field.csv")
+    model, preprocessor, _ = load_artifacts()
+    plan = get_scoring_plan()
+
+    def reference(frame):
+        return model.predict_proba(preprocessor.transform(prepare_features(frame)))
+
+    with_missing = df.head(500).copy()
+    with_missing.loc[::7, "Coding_Skills"] = np.nan
+    with_missing.loc[::11, "GPA"] = np.nan
+
+    print(f"✅ Parity on {len(df)} rows: max |Δp| {check_parity(plan, df, reference):.1e}")
+    print(f"✅ Parity with missing inputs: max |Δp| {check_parity(plan, with_missing, reference):.1e}")
+    check_dispatch(df.head(500))
+    print("✅ predict_top3 uses the plan, and the pipeline for categorical preprocessors")
+
+    profile = df[RAW_FEATURES].iloc[0].to_dict()
+    row_df = df.head(1)
+
+    for name, fn, repeat in [
+        ("plan (dict)", lambda: plan.top_k(profile), 20_000),
+        ("predict_top_3", lambda: predict_top_3(row_df), 200),
+    ]:
+        fn()
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        print(f"⏱️ {name:<15} {(time.perf_counter() - start) / repeat * 1e6:9.1f} µs per profile")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+"""
+Local HTTP/JSON inference service.
+
+    python -m src.service --port 8000
+
+    POST /predict     {"profile": {...}} or {"profiles": [{...}, ...]}
+    POST /recommend   {"category": "..."} or {"profile": {...}}
+                      optional "top_n_fields", "top_n_careers"
+    GET  /health
+    GET  /metrics     Prometheus text format
+
+Profiles from concurrent requests are collected by a MicroBatcher and scored
+together: a batch is closed once it holds `max_batch_size` profiles or its
+first profile has waited `max_wait_ms`, and every batch is one predict_top_k
+(one predict_proba) call, run off the event loop.
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from . import instrumentation
+from .predict_top3 import artifact_stats, predict_top_k, registry
+from .recommend_field_and_career import load_index, recommend_fields_and_careers
+from .scoring_plan import RAW_FEATURES
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+MAX_BATCH_SIZE = 64
+MAX_WAIT_MS = 5
+MAX_BODY_BYTES = 1 << 20
+
+# Upper bounds of the batch size histogram in /metrics
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class RequestError(Exception):
+    """Client error; becomes a JSON error response with `status`."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+# -------------------------
+# METRICS
+# -------------------------
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def lines(self, name, labels=""):
+        sep = "," if labels else ""
+        out = [f'{name}_bucket{{{labels}{sep}le="{bound}"}} {n}'
+               for bound, n in zip(self.buckets, self.counts)]
+        out.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}')
+        out.append(f"{name}_sum{{{labels}}} {self.sum}" if labels else f"{name}_sum {self.sum}")
+        out.append(f"{name}_count{{{labels}}} {self.count}" if labels else f"{name}_count {self.count}")
+        return out
+
+
+class Metrics:
+    def __init__(self):
+        self.started = time.time()
+        self.requests = defaultdict(int)
+        self.latency = defaultdict(lambda: Histogram(LATENCY_BUCKETS))
+        self.batch_size = Histogram(BATCH_SIZE_BUCKETS)
+        self.batch_seconds = Histogram(LATENCY_BUCKETS)
+
+    def record_request(self, path, status, seconds):
+        self.requests[(path, status)] += 1
+        self.latency[path].observe(seconds)
+
+    def render(self, queue_depth):
+        lines = [
+            "# TYPE career_requests_total counter",
+            *(f'career_requests_total{{path="{path}",status="{status}"}} {n}'
+              for (path, status), n in sorted(self.requests.items())),
+            "# TYPE career_request_seconds histogram",
+        ]
+        for path, histogram in sorted(self.latency.items()):
+            lines += histogram.lines("career_request_seconds", f'path="{path}"')
+        lines += ["# TYPE career_batch_size histogram", *self.batch_size.lines("career_batch_size")]
+        lines += ["# TYPE career_batch_seconds histogram", *self.batch_seconds.lines("career_batch_seconds")]
+
+        stats = artifact_stats()
+        lines += [
+            "# TYPE career_queue_depth gauge",
+            f"career_queue_depth {queue_depth}",
+            "# TYPE career_uptime_seconds gauge",
+            f"career_uptime_seconds {time.time() - self.started:.3f}",
+            "# TYPE career_artifact_cache_hits_total counter",
+            f"career_artifact_cache_hits_total {stats['cache_hits']}",
+            "# TYPE career_artifact_reloads_total counter",
+            f"career_artifact_reloads_total {stats['reloads']}",
+            "# TYPE career_artifact_failed_reloads_total counter",
+            f"career_artifact_failed_reloads_total {stats['failed_reloads']}",
+        ]
+        # Per-stage timings when INSTRUMENTATION=1
+        return "\n".join(lines) + "\n" + instrumentation.prometheus_text()
+
+
+# -------------------------
+# MICRO-BATCHING
+# -------------------------
+class MicroBatcher:
+    """
+    Queue of single profiles scored in batches.
+
+    submit() returns the top-k of one profile; a background task drains the
+    queue into batches of at most max_batch_size, waiting at most
+    max_wait_ms after the first profile of a batch for more to arrive.
+    """
+
+    def __init__(self, metrics, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS, k=3):
+        self.metrics = metrics
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.k = k
+        self.queue = asyncio.Queue()
+        # One scoring thread: batches never compete with each other for the CPU
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="scoring")
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+        self.executor.shutdown(wait=False)
+
+    async def submit(self, profile):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((profile, future))
+        return await future
+
+    async def _collect(self):
+        batch = [await self.queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # Whatever else is already queued costs nothing to add
+        while len(batch) < self.max_batch_size and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        return batch
+
+    def _score(self, profiles):
+        start = time.perf_counter()
+        categories, confidences = predict_top_k(pd.DataFrame(profiles, columns=RAW_FEATURES), k=self.k)
+        return categories, confidences, time.perf_counter() - start
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            profiles = [profile for profile, _ in batch]
+            try:
+                categories, confidences, seconds = await loop.run_in_executor(
+                    self.executor, self._score, profiles)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.metrics.batch_size.observe(len(batch))
+            self.metrics.batch_seconds.observe(seconds)
+            for i, (_, future) in enumerate(batch):
+                if not future.done():
+                    future.set_result([
+                        {"category": str(category), "confidence": float(confidence)}
+                        for category, confidence in zip(categories[i], confidences[i])
+                    ])
+
+
+# -------------------------
+# HANDLERS
+# -------------------------
+def parse_profile(profile):
+    if not isinstance(profile, dict):
+        raise RequestError(400, "a profile must be a JSON object")
+    missing = [f for f in RAW_FEATURES if f not in profile]
+    if missing:
+        raise RequestError(400, f"profile is missing {', '.join(missing)}")
+    try:
+        return [float(profile[f]) for f in RAW_FEATURES]
+    except (TypeError, ValueError):
+        raise RequestError(400, "profile values must be numbers")
+
+
+def profiles_from(body):
+    if "profiles" in body:
+        if not isinstance(body["profiles"], list) or not body["profiles"]:
+            raise RequestError(400, '"profiles" must be a non-empty list')
+        return [parse_profile(p) for p in body["profiles"]], True
+    if "profile" in body:
+        return [parse_profile(body["profile"])], False
+    raise RequestError(400, 'expected "profile" or "profiles"')
+
+
+def recommendations_for(categories, top_n_fields, top_n_careers):
+    """Fields and careers of every {"category": ...} entry, added to a copy of it."""
+    recommendations = []
+    for entry in categories:
+        fields, careers = recommend_fields_and_careers(
+            None, entry["category"], top_n_fields, top_n_careers)
+        recommendations.append({**entry, "fields": fields, "careers": careers})
+    return recommendations
+
+
+class Service:
+    def __init__(self, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.metrics = Metrics()
+        self.batcher = MicroBatcher(self.metrics, max_batch_size, max_wait_ms)
+        self.routes = {
+            ("POST", "/predict"): self.predict,
+            ("POST", "/recommend"): self.recommend,
+            ("GET", "/health"): self.health,
+            ("GET", "/metrics"): self.prometheus,
+        }
+
+    async def predict(self, body):
+        profiles, many = profiles_from(body)
+        results = await asyncio.gather(*(self.batcher.submit(p) for p in profiles))
+        return {"predictions": results} if many else {"prediction": results[0]}
+
+    async def recommend(self, body):
+        top_n_fields = body.get("top_n_fields", 2)
+        top_n_careers = body.get("top_n_careers", 3)
+        if any(isinstance(n, bool) or not isinstance(n, int) for n in (top_n_fields, top_n_careers)):
+            raise RequestError(400, '"top_n_fields" and "top_n_careers" must be integers')
+
+        if "category" in body:
+            if not isinstance(body["category"], str):
+                raise RequestError(400, '"category" must be a string')
+            categories = [{"category": body["category"]}]
+        else:
+            profiles, many = profiles_from(body)
+            if many:
+                raise RequestError(400, "/recommend takes one profile")
+            categories = await self.batcher.submit(profiles[0])
+
+        # the index may be (re)loaded from disk: off the event loop, and not
+        # queued behind the scoring batches
+        recommendations = await asyncio.get_running_loop().run_in_executor(
+            None, recommendations_for, categories, top_n_fields, top_n_careers)
+        return {"recommendations": recommendations}
+
+    async def health(self, body):
+        # version() may stat and hash the artifact files: off the event loop
+        version = await asyncio.get_running_loop().run_in_executor(None, registry.version)
+        return {
+            "status": "ok",
+            "artifacts": list(version),
+            "queue_depth": self.batcher.queue.qsize(),
+        }
+
+    async def prometheus(self, body):
+        return self.metrics.render(self.batcher.queue.qsize())
+
+    # -------------------------
+    # HTTP
+    # -------------------------
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                keep_alive = await self._handle_request(request_line, reader, writer)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _handle_request(self, request_line, reader, writer):
+        start = time.perf_counter()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            method, target, version = request_line.decode("latin-1").split()
+        except ValueError:
+            method, target, version = "", "", "HTTP/1.0"
+        path = target.split("?", 1)[0]
+        keep_alive = (headers.get("connection", "").lower() != "close"
+                      and version == "HTTP/1.1")
+
+        try:
+            try:
+                length = int(headers.get("content-length") or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                # the body can't be delimited, so the connection can't be reused
+                keep_alive = False
+                raise RequestError(400, "invalid Content-Length")
+            if length > MAX_BODY_BYTES:
+                keep_alive = False
+                raise RequestError(413, f"request body over {MAX_BODY_BYTES} bytes")
+            raw_body = await reader.readexactly(length) if length else b""
+
+            handler = self.routes.get((method, path))
+            if handler is None:
+                known = any(route_path == path for _, route_path in self.routes)
+                raise RequestError(405 if known else 404, f"{method} {path} not supported")
+
+            body = {}
+            if raw_body:
+                try:
+                    body = json.loads(raw_body)
+                except json.JSONDecodeError:
+                    raise RequestError(400, "request body is not valid JSON")
+                if not isinstance(body, dict):
+                    raise RequestError(400, "request body must be a JSON object")
+
+            status, payload = 200, await handler(body)
+        except RequestError as e:
+            status, payload = e.status, {"error": str(e)}
+        except Exception as e:
+            status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+
+        if isinstance(payload, str):
+            content, content_type = payload.encode(), "text/plain; version=0.0.4"
+        else:
+            content, content_type = json.dumps(payload).encode(), "application/json"
+
+        writer.write(
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(content)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode()
+            + content
+        )
+        self.metrics.record_request(path if (method, path) in self.routes else "other", status,
+                                    time.perf_counter() - start)
+        return keep_alive
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+    # Load artifacts and the recommendation index before the first request
+    registry.get()
+    load_index()
+
+    service = Service(max_batch_size, max_wait_ms)
+    service.batcher.start()
+    server = await asyncio.start_server(service.handle, host, port)
+
+    print(f"✅ Serving on http://{host}:{port} "
+          f"(batches of up to {max_batch_size}, {max_wait_ms} ms wait)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.batcher.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local career prediction HTTP service")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-batch-size", type=int, default=MAX_BATCH_SIZE,
+                        help="profiles scored per predict_proba call")
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS,
+                        help="how long a batch waits for more profiles")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_batch_size, args.max_wait_ms))
+    except KeyboardInterrupt:
+        print("\n👋 Service stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+"""
+Ranges and steps of the profile page sliders.
+
+Imports nothing, so app.py can build the sliders from it before pandas and
+the model code are loaded; the what-if grid moves inputs by these steps.
+"""
+
+# feature: (min, max, step)
+FEATURE_LIMITS = {
+    "GPA": (0.0, 10.0, 0.1),
+    "Field_Specific_Courses": (0, 10, 1),
+    "Internships": (0, 5, 1),
+    "Projects": (0, 10, 1),
+    "Research_Experience": (0, 5, 1),
+    "Industry_Certifications": (0, 5, 1),
+    "Extracurricular_Activities": (0, 10, 1),
+    "Leadership_Positions": (0, 5, 1),
+    "Coding_Skills": (0, 5, 1),
+    "Communication_Skills": (0, 5, 1),
+    "Problem_Solving_Skills": (0, 5, 1),
+    "Analytical_Skills": (0, 5, 1),
+    "Teamwork_Skills": (0, 5, 1),
+    "Presentation_Skills": (0, 5, 1),
+    "Networking_Skills": (0, 5, 1),
+}
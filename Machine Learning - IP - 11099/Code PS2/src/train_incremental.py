@@ -0,0 +1,326 @@
+"""
+Out-of-core training of the career model.
+
+Streams the raw career CSV in chunks, so peak memory depends on --chunksize,
+not on the number of rows:
+
+    pass 1   per chunk: career category + engineered features, then
+             - StandardScaler.partial_fit (NaN-aware running mean/variance)
+             - a reservoir sample of rows for the imputer medians
+             - the set of labels
+    epochs   SGDClassifier(loss="log_loss").partial_fit on every chunk;
+             the first epoch caches the transformed chunks as .npz files,
+             later epochs read those back in shuffled order
+
+The preprocessor is the one data_preprocessing builds, fitted on the
+reservoir sample and then given the streamed statistics, so preprocessor.pkl,
+label_encoder.pkl and career_model.pkl load through predict_top3 as usual.
+Every VALIDATION_EVERY-th row is held out and scored during each epoch.
+
+The artifacts are only written when the final model's log loss on (up to
+GATE_ROWS of) the held-out rows beats predicting the training class
+frequencies and is no worse than the model currently saved; --force skips
+that check.
+
+    python -m src.train_incremental --chunksize 100000 --epochs 5
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import log_loss
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from . import train_model
+from .artifact_registry import atomic_dump
+from .export_model import load_model
+from .create_career_category import RAW_DATA_PATH, add_career_category
+from .data_preprocessing import (
+    LABEL_ENCODER_PATH,
+    PREPROCESSOR_PATH,
+    TARGET_COLUMN,
+    build_preprocessor,
+)
+from .feature_engineering_utils import add_engineered_features
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+CHUNKSIZE = 100_000
+EPOCHS = 5
+# Rows kept to estimate the imputer medians; exact below this many rows
+RESERVOIR_SIZE = 100_000
+# Every n-th row of the file is held out for validation
+VALIDATION_EVERY = 10
+# SGD regularisation; 1e-4 overfits this data, validation log loss grows every epoch
+ALPHA = 1e-2
+# Held-out rows kept to compare the new model with the saved one
+GATE_ROWS = 50_000
+
+
+def prepare_chunk(chunk):
+    """(features, labels) of a raw chunk, as preprocess() would see them."""
+    df = add_engineered_features(add_career_category(chunk))
+    cols_to_drop = [col for col in [TARGET_COLUMN, "Field", "Career"] if col in df.columns]
+    return df.drop(columns=cols_to_drop), df[TARGET_COLUMN].to_numpy()
+
+
+def read_chunks(path, chunksize):
+    """Yield (first_row_index, features, labels) for every chunk of the raw CSV."""
+    start = 0
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        X, labels = prepare_chunk(chunk)
+        yield start, X, labels
+        start += len(chunk)
+
+
+def update_reservoir(reservoir, rows, seen, rng):
+    """
+    Reservoir sampling (algorithm R) of a whole chunk at once.
+
+    `seen` rows came before this chunk. Returns (reservoir, seen); every row
+    read so far is in the reservoir with the same probability.
+    """
+    size = len(reservoir) if reservoir is not None else 0
+    capacity = RESERVOIR_SIZE
+
+    free = max(capacity - size, 0)
+    if free:
+        head = rows[:free]
+        reservoir = head.copy() if reservoir is None else np.vstack([reservoir, head])
+        rows = rows[free:]
+        seen += len(head)
+
+    if len(rows):
+        # row i (0-based over the whole file) replaces slot j ~ U[0, i]
+        positions = seen + np.arange(len(rows))
+        slots = (rng.random(len(rows)) * (positions + 1)).astype(np.int64)
+        keep = slots < capacity
+        reservoir[slots[keep]] = rows[keep]
+        seen += len(rows)
+
+    return reservoir, seen
+
+
+def fit_statistics(path, chunksize, seed=42):
+    """
+    First pass over the file.
+
+    Returns (sample, scaler, medians, classes): a DataFrame sample of the
+    features, a StandardScaler holding the statistics of the imputed
+    features of all rows, the approximate medians and the sorted labels.
+    """
+    rng = np.random.default_rng(seed)
+    scaler = StandardScaler()
+    reservoir, seen = None, 0
+    classes = set()
+    columns = None
+
+    for _, X, labels in read_chunks(path, chunksize):
+        if columns is None:
+            categorical = X.select_dtypes(exclude=[np.number]).columns.tolist()
+            if categorical:
+                raise ValueError(f"Streaming training needs numeric features, got {categorical}")
+            columns = X.columns.tolist()
+        values = X[columns].to_numpy(dtype=np.float64)
+
+        # NaNs are skipped here and corrected for below
+        scaler.partial_fit(values)
+        reservoir, seen = update_reservoir(reservoir, values, seen, rng)
+        classes.update(pd.unique(labels).tolist())
+
+    if columns is None:
+        raise ValueError(f"No rows in {path}")
+
+    medians = np.nanmedian(reservoir, axis=0)
+
+    # The pipeline scales the imputed data: missing values count as the median
+    observed = np.broadcast_to(scaler.n_samples_seen_, medians.shape).astype(np.float64)
+    missing = seen - observed
+    mean = (observed * scaler.mean_ + missing * medians) / seen
+    var = (observed * (scaler.var_ + (scaler.mean_ - mean) ** 2)
+           + missing * (medians - mean) ** 2) / seen
+    scaler.mean_, scaler.var_, scaler.n_samples_seen_ = mean, var, seen
+    scaler.scale_ = np.where(var > 0, np.sqrt(var), 1.0)
+
+    sample = pd.DataFrame(reservoir, columns=columns)
+    return sample, scaler, medians, sorted(classes)
+
+
+def build_streaming_preprocessor(sample, scaler, medians, output_mode="dense"):
+    """data_preprocessing's preprocessor, with the statistics of the full stream."""
+    preprocessor, _, _ = build_preprocessor(sample, output_mode)
+    preprocessor.fit(sample)
+
+    numeric = preprocessor.named_transformers_["num"].named_steps
+    numeric["imputer"].statistics_ = medians
+    fitted_scaler = numeric["scaler"]
+    fitted_scaler.mean_ = scaler.mean_
+    fitted_scaler.var_ = scaler.var_
+    fitted_scaler.scale_ = scaler.scale_
+    fitted_scaler.n_samples_seen_ = scaler.n_samples_seen_
+    return preprocessor
+
+
+def _holdout(start, n_rows):
+    return (start + np.arange(n_rows)) % VALIDATION_EVERY == 0
+
+
+def _split(start, X, y):
+    holdout = _holdout(start, len(y))
+    return X[~holdout], y[~holdout], X[holdout], y[holdout]
+
+
+def train_incremental(path=RAW_DATA_PATH, chunksize=CHUNKSIZE, epochs=EPOCHS,
+                      output_mode="dense", alpha=ALPHA, seed=42):
+    """
+    Fit the preprocessor, label encoder and an SGD logistic model out of core.
+
+    Returns (model, preprocessor, label_encoder, history, X_check, gate)
+    where history has the validation accuracy and log loss of every epoch,
+    X_check holds a few transformed rows for the compact export check and
+    gate holds the raw held-out rows and the training class counts that
+    quality_gate() needs.
+    """
+    t0 = time.perf_counter()
+    sample, scaler, medians, classes = fit_statistics(path, chunksize, seed)
+    preprocessor = build_streaming_preprocessor(sample, scaler, medians, output_mode)
+    label_encoder = LabelEncoder().fit(classes)
+    encoded_classes = np.arange(len(classes))
+    print(f"📌 Statistics of {scaler.n_samples_seen_} rows in {time.perf_counter() - t0:.1f}s")
+
+    model = SGDClassifier(loss="log_loss", alpha=alpha, average=True, random_state=seed)
+    rng = np.random.default_rng(seed)
+    history = []
+    X_check = None
+    gate = {"X": [], "labels": [], "n_rows": 0, "class_counts": np.zeros(len(classes))}
+
+    with tempfile.TemporaryDirectory(prefix="career-chunks-") as cache_dir:
+        cached = []
+        for epoch in range(epochs):
+            t0 = time.perf_counter()
+            if epoch == 0:
+                def chunks():
+                    for start, X, labels in read_chunks(path, chunksize):
+                        data = _split(start, preprocessor.transform(X), label_encoder.transform(labels))
+                        gate["class_counts"] += np.bincount(data[1], minlength=len(classes))
+                        if gate["n_rows"] < GATE_ROWS:
+                            holdout = _holdout(start, len(labels))
+                            gate["X"].append(X[holdout].iloc[:GATE_ROWS - gate["n_rows"]])
+                            gate["labels"].append(labels[holdout][:GATE_ROWS - gate["n_rows"]])
+                            gate["n_rows"] += len(gate["labels"][-1])
+                        chunk_path = os.path.join(cache_dir, f"chunk-{len(cached)}.npz")
+                        np.savez(chunk_path, *data)
+                        cached.append(chunk_path)
+                        yield data
+            else:
+                def chunks():
+                    for i in rng.permutation(len(cached)):
+                        with np.load(cached[i]) as f:
+                            yield tuple(f[f"arr_{j}"] for j in range(4))
+
+            correct, losses, n_valid = 0, 0.0, 0
+            for X_train, y_train, X_valid, y_valid in chunks():
+                if X_check is None:
+                    X_check = X_train[:train_model.EXPORT_CHECK_ROWS]
+                order = rng.permutation(len(y_train))
+                model.partial_fit(X_train[order], y_train[order], classes=encoded_classes)
+
+                if len(y_valid):
+                    proba = model.predict_proba(X_valid)
+                    correct += int((proba.argmax(axis=1) == y_valid).sum())
+                    losses += log_loss(y_valid, proba, labels=encoded_classes) * len(y_valid)
+                    n_valid += len(y_valid)
+
+            # Scored during the epoch, so earlier chunks see a less trained model
+            history.append({
+                "epoch": epoch + 1,
+                "valid_accuracy": correct / max(n_valid, 1),
+                "valid_log_loss": losses / max(n_valid, 1),
+                "seconds": time.perf_counter() - t0,
+            })
+            print(f"   epoch {epoch + 1}: accuracy {history[-1]['valid_accuracy']:.4f}, "
+                  f"log loss {history[-1]['valid_log_loss']:.4f} ({history[-1]['seconds']:.1f}s)")
+
+    gate["X"] = pd.concat(gate["X"], ignore_index=True)
+    gate["labels"] = np.concatenate(gate["labels"])
+    return model, preprocessor, label_encoder, history, X_check, gate
+
+
+def quality_gate(model, preprocessor, label_encoder, gate):
+    """
+    Held-out log loss of the new model, of predicting the training class
+    frequencies ("prior") and of the saved model ("current", None when there
+    is none or it does not know every held-out label).
+    """
+    X, labels = gate["X"], gate["labels"]
+    classes = label_encoder.classes_
+    losses = {"candidate": log_loss(labels, model.predict_proba(preprocessor.transform(X)), labels=classes)}
+
+    prior = gate["class_counts"] / gate["class_counts"].sum()
+    losses["prior"] = log_loss(labels, np.tile(prior, (len(labels), 1)), labels=classes)
+
+    losses["current"] = None
+    if all(os.path.exists(p) for p in (train_model.MODEL_PATH, PREPROCESSOR_PATH, LABEL_ENCODER_PATH)):
+        current_encoder = joblib.load(LABEL_ENCODER_PATH)
+        if np.isin(labels, current_encoder.classes_).all():
+            current_proba = load_model(train_model.MODEL_PATH).predict_proba(
+                joblib.load(PREPROCESSOR_PATH).transform(X)
+            )
+            losses["current"] = log_loss(labels, current_proba, labels=current_encoder.classes_)
+    return losses
+
+
+def peak_memory_mb():
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the career model out of core")
+    parser.add_argument("--input", default=RAW_DATA_PATH, help="raw career CSV")
+    parser.add_argument("--chunksize", type=int, default=CHUNKSIZE, help="rows read per chunk")
+    parser.add_argument("--epochs", type=int, default=EPOCHS, help="passes of partial_fit over the data")
+    parser.add_argument("--alpha", type=float, default=ALPHA, help="SGD regularisation strength")
+    parser.add_argument("--output-mode", choices=["dense", "float32"], default="dense",
+                        help="preprocessor output, see data_preprocessing")
+    parser.add_argument("--force", action="store_true",
+                        help="save the model even when it scores worse than the saved one")
+    args = parser.parse_args()
+
+    model, preprocessor, label_encoder, _, X_check, gate = train_incremental(
+        args.input, args.chunksize, args.epochs, args.output_mode, args.alpha
+    )
+
+    losses = quality_gate(model, preprocessor, label_encoder, gate)
+    current = "none saved" if losses["current"] is None else f"{losses['current']:.4f}"
+    print(f"📌 Held-out log loss: new {losses['candidate']:.4f}, "
+          f"class frequencies {losses['prior']:.4f}, saved model {current}")
+    worse = losses["candidate"] >= losses["prior"] or (
+        losses["current"] is not None and losses["candidate"] > losses["current"]
+    )
+    if worse and not args.force:
+        parser.exit(1, "⚠️ New model is worse, nothing saved (--force saves it anyway)\n")
+
+    os.makedirs("models", exist_ok=True)
+    atomic_dump(preprocessor, PREPROCESSOR_PATH)
+    atomic_dump(label_encoder, LABEL_ENCODER_PATH)
+    train_model.save_model(model, X_check=X_check)
+
+    print("\n✅ Incremental training completed")
+    print(f"📁 Model path: {train_model.MODEL_PATH}")
+    print(f"📁 Preprocessor saved to: {PREPROCESSOR_PATH}")
+    if peak_memory_mb() is not None:
+        print(f"📌 Peak memory: {peak_memory_mb():.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
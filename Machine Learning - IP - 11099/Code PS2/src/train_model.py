@@ -1,22 +1,96 @@
+import argparse
+import hashlib
+import json
+import math
+import joblib
 import pandas as pd
 import numpy as np
-import joblib
 import os
+import time
+from scipy import sparse
 
-from sklearn.model_selection import train_test_split, cross_val_score
+from joblib import Parallel, delayed, effective_n_jobs, parallel_config
+from sklearn.base import clone
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
 from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 
+try:
+    from .artifact_registry import file_hash, file_signature
+    from .export_model import COMPACT_MODEL_DIR, export_model, remove_export
+except ImportError:  # run as a script: python src/train_model.py
+    from artifact_registry import file_hash, file_signature
+    from export_model import COMPACT_MODEL_DIR, export_model, remove_export
+
 
 DATA_PATH = "data/processed/clean_data.csv"
+FEATURES_PATH = "data/processed/clean_features.npy"
+LABELS_PATH = "data/processed/clean_labels.npy"
+COLUMNS_PATH = "data/processed/clean_columns.json"
+META_PATH = "data/processed/clean_meta.json"
+CSR_PATHS = {
+    "data": "data/processed/clean_features_csr_data.npy",
+    "indices": "data/processed/clean_features_csr_indices.npy",
+    "indptr": "data/processed/clean_features_csr_indptr.npy",
+}
 MODEL_PATH = "models/career_model.pkl"
+SELECTION_LOG_PATH = "models/model_selection.json"
+SEARCH_CACHE_PATH = "models/search_cache.jsonl"
+SEARCH_LOG_PATH = "models/search_frontier.csv"
 TARGET_COLUMN = "Career_Category"
 
+def _processed_meta():
+    """
+    The meta file of the last save_processed, after checking that every file
+    it lists is still the one written: same (mtime, size), or else the same
+    content hash. None when there is no meta file.
+    """
+    if not os.path.exists(META_PATH):
+        return None
+    with open(META_PATH) as f:
+        meta = json.load(f)
+
+    for path, written in meta["files"].items():
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} is missing. Run preprocessing again.")
+        if list(file_signature(path)) != written["signature"] and file_hash(path) != written["sha256"]:
+            raise ValueError(f"{path} changed since preprocessing wrote it. Run preprocessing again.")
+    return meta
+
+
 def load_data():
+    """
+    Return (X, y, feature_names) of the clean data.
+
+    Only the files the last data_preprocessing run wrote are read (see
+    _processed_meta). The .npy files are memory-mapped read-only, so nothing
+    is parsed or copied up front; a sparse preprocessor output is rebuilt as
+    a CSR matrix over the mapped arrays. clean_data.csv is read when the
+    last run wrote only CSV, or when there is no meta file.
+    """
+    meta = _processed_meta()
+    if meta is not None and meta["layout"] is not None:
+        with open(COLUMNS_PATH) as f:
+            feature_names = json.load(f)
+        y = np.load(LABELS_PATH, mmap_mode="r")
+
+        if meta["layout"] == "dense":
+            X = np.load(FEATURES_PATH, mmap_mode="r")
+        else:
+            parts = {part: np.load(path, mmap_mode="r") for part, path in CSR_PATHS.items()}
+            X = sparse.csr_matrix(
+                (parts["data"], parts["indices"], parts["indptr"]),
+                shape=(len(y), len(feature_names)),
+                copy=False
+            )
+        return X, y, feature_names
+
     if not os.path.exists(DATA_PATH):
         raise FileNotFoundError("Clean data not found. Run preprocessing first.")
-    return pd.read_csv(DATA_PATH)
+    df = pd.read_csv(DATA_PATH)
+    X = df.drop(columns=[TARGET_COLUMN])
+    return X.to_numpy(), df[TARGET_COLUMN].to_numpy(), X.columns.tolist()
 
 
 def train_models(X_train, y_train):
@@ -29,53 +103,405 @@ def train_models(X_train, y_train):
             n_jobs=-1
         )
     }
+
+    # Histogram boosting bins every feature into at most 255 values. The
+    # integer skill columns keep one bin per level even after scaling, so
+    # the ordinary ordered splits lose nothing on them; they are not passed
+    # as categorical_features, which needs unscaled integer codes and would
+    # drop the order of the levels. Fit time grows with bins x iterations
+    # rather than rows x depth, and early stopping keeps only the useful
+    # trees, so the model stays small on large datasets. It needs dense
+    # input; a sparse preprocessor output would have to be densified with
+    # every one-hot column, so it is skipped instead.
+    if sparse.issparse(X_train):
+        print("⚠️ HistGradientBoosting skipped: it needs dense input "
+              "(preprocess with --output-mode dense or float32)")
+    else:
+        models["HistGradientBoosting"] = HistGradientBoostingClassifier(
+            max_iter=500,
+            learning_rate=0.1,
+            early_stopping=True,
+            validation_fraction=0.1,
+            n_iter_no_change=10,
+            random_state=42
+        )
+
     return models
 
 
-def evaluate_model(model, X_train, y_train, X_test, y_test):
-    model.fit(X_train, y_train)
+# Hyperparameter grid explored by --search, per candidate in train_models
+SEARCH_SPACE = {
+    "LogisticRegression": {
+        "C": [0.01, 0.1, 1.0, 10.0],
+    },
+    "RandomForest": {
+        "max_depth": [None, 8, 16],
+        "min_samples_leaf": [1, 5, 20],
+        "max_features": ["sqrt", 0.5],
+    },
+    "HistGradientBoosting": {
+        "learning_rate": [0.05, 0.1, 0.2],
+        "max_leaf_nodes": [15, 31, 63],
+        "l2_regularization": [0.0, 1.0],
+    },
+}
 
-    y_pred = model.predict(X_test)
+# Models that can be budgeted by number of trees instead of rows, and the
+# parameter that sets it
+TREE_MODELS = {
+    "RandomForest": "n_estimators",
+    "HistGradientBoosting": "max_iter",
+}
 
-    accuracy = accuracy_score(y_test, y_pred)
-    cv_score = cross_val_score(model, X_train, y_train, cv=5).mean()
 
-    return accuracy, cv_score, classification_report(y_test, y_pred)
+def split_jobs(n_tasks, n_jobs=-1):
+    """
+    Share n_jobs CPUs between parallel fits and the threads inside each fit.
 
+    Returns (outer, inner): `outer` fits run at once and each gets `inner`
+    cores for its own n_jobs / BLAS threads, so outer * inner never exceeds
+    the CPUs asked for.
+    """
+    n_jobs = effective_n_jobs(n_jobs)
+    outer = max(1, min(n_jobs, n_tasks))
+    inner = max(1, n_jobs // outer)
+    return outer, inner
 
-def main():
-    df = load_data()
 
-    X = df.drop(columns=[TARGET_COLUMN])
-    y = df[TARGET_COLUMN]
+def _fit_fold(name, model, X, y, fold, train_idx, test_idx, key=None):
+    start = time.perf_counter()
+    model.fit(X[train_idx], y[train_idx])
+    fit_time = time.perf_counter() - start
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
+    y_pred = model.predict(X[test_idx])
+
+    return {
+        "model": name,
+        "fold": fold,
+        "accuracy": accuracy_score(y[test_idx], y_pred),
+        "fit_seconds": fit_time,
+        "test_idx": test_idx,
+        "y_pred": y_pred,
+        "key": key,
+    }
 
-    models = train_models(X_train, y_train)
 
-    best_model = None
-    best_score = 0
+def cross_validate_models(models, X, y, cv=5, n_jobs=-1):
+    """
+    Run every (model, fold) fit in parallel.
 
+    Workers are separate processes; joblib memory-maps X and y for them
+    (an already memory-mapped X is passed by file reference), so the data is
+    shared read-only instead of copied per fit. Models with their own n_jobs
+    are limited to the cores left per fit.
+
+    Returns the per-fit records (accuracy and fit wall time) and the
+    out-of-fold predictions of every model.
+    """
+    folds = list(StratifiedKFold(n_splits=cv).split(np.zeros(len(y)), y))
+    outer, inner = split_jobs(len(models) * len(folds), n_jobs)
+
+    tasks = []
     for name, model in models.items():
-        accuracy, cv_score, report = evaluate_model(
-            model, X_train, y_train, X_test, y_test
-        )
+        for fold, (train_idx, test_idx) in enumerate(folds):
+            model = clone(model)
+            if "n_jobs" in model.get_params():
+                model.set_params(n_jobs=inner)
+            tasks.append(delayed(_fit_fold)(name, model, X, y, fold, train_idx, test_idx))
+
+    with parallel_config(backend="loky", inner_max_num_threads=inner):
+        results = Parallel(n_jobs=outer, max_nbytes="1M", mmap_mode="r")(tasks)
+
+    oof_predictions = {name: np.empty(len(y), dtype=np.asarray(y).dtype) for name in models}
+    for result in results:
+        oof_predictions[result["model"]][result.pop("test_idx")] = result.pop("y_pred")
+
+    return results, oof_predictions
+
+
+def select_best_model(X, y, cv=5, n_jobs=-1):
+    """
+    Pick the candidate with the best mean CV accuracy and refit only it on
+    all of X, y. Per-fit timings are written to SELECTION_LOG_PATH.
+    """
+    models = train_models(X, y)
+
+    records, oof_predictions = cross_validate_models(models, X, y, cv=cv, n_jobs=n_jobs)
+
+    best_name = None
+    best_score = 0
+
+    for name in models:
+        scores = [r["accuracy"] for r in records if r["model"] == name]
+        fit_times = [r["fit_seconds"] for r in records if r["model"] == name]
 
         print(f"\n📌 Model: {name}")
-        print(f"Test Accuracy: {accuracy:.4f}")
-        print(f"CV Accuracy:   {cv_score:.4f}")
+        print(f"CV Accuracy:   {np.mean(scores):.4f} ± {np.std(scores):.4f}")
+        print(f"Fit time:      {np.mean(fit_times):.2f}s per fold")
+
+        if np.mean(scores) > best_score:
+            best_score = np.mean(scores)
+            best_name = name
+
+    print(f"\n🏆 Best model: {best_name}")
+    print(classification_report(y, oof_predictions[best_name], zero_division=0))
+
+    best_model = clone(models[best_name])
+    start = time.perf_counter()
+    best_model.fit(X, y)
+    refit_time = time.perf_counter() - start
+
+    os.makedirs("models", exist_ok=True)
+    with open(SELECTION_LOG_PATH, "w") as f:
+        json.dump({
+            "best_model": best_name,
+            "cv_accuracy": best_score,
+            "refit_seconds": refit_time,
+            "fits": records,
+        }, f, indent=2)
+
+    return best_model
+
 
-        if cv_score > best_score:
-            best_score = cv_score
-            best_model = model
+def data_fingerprint(X, y):
+    """Hash of the training data, so cached search results die with it."""
+    digest = hashlib.sha256()
+    arrays = [X.data, X.indices, X.indptr] if sparse.issparse(X) else [X]
+    for array in arrays + [y]:
+        digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
 
+
+def _load_search_cache():
+    cache = {}
+    if os.path.exists(SEARCH_CACHE_PATH):
+        with open(SEARCH_CACHE_PATH) as f:
+            for line in f:
+                # a search killed mid-write leaves a truncated last line
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                cache[record["key"]] = record
+    return cache
+
+
+def _resource_schedule(n_candidates, max_resource, min_resource, eta):
+    """Resource per round: grows by eta while the candidates shrink by eta,
+    the last round always at max_resource."""
+    n_rounds = max(1, math.ceil(math.log(n_candidates, eta))) if n_candidates > 1 else 1
+    if min_resource is None:
+        min_resource = max(1, max_resource // eta ** (n_rounds - 1))
+    schedule = [min(max_resource, min_resource * eta ** i) for i in range(n_rounds)]
+    # min_resource * eta ** k rounds down below max_resource; the finalists
+    # are always judged on the full resource
+    schedule[-1] = max_resource
+    return schedule
+
+
+def successive_halving_search(X, y, resource="n_samples", budget_seconds=600, eta=3,
+                              cv=3, min_resource=None, n_jobs=-1):
+    """
+    Budgeted successive halving over SEARCH_SPACE.
+
+    Every round fits all surviving candidates on `cv` folds with a growing
+    resource - training rows per fold ("n_samples") or trees / boosting
+    iterations ("n_estimators", tree models only) - and keeps the best 1/eta of them.
+    The search stops when one candidate is left, the resource is exhausted
+    or `budget_seconds` of wall clock are used; the best candidate of the
+    last finished round wins. The budget is checked after every finished
+    fold fit: no new fits start once it is used, but fits already running
+    are not interrupted, so the search can overrun it by the length of one
+    batch of parallel fits. If the budget runs out before any round
+    finishes, the first candidate (the default parameters of the first
+    model) is returned with a warning; its fits so far stay cached.
+
+    Each finished fold fit is appended to SEARCH_CACHE_PATH keyed by data,
+    candidate, resource and fold, so an interrupted search resumes where it
+    stopped. The (fit time, accuracy) frontier of every candidate and round
+    is written to SEARCH_LOG_PATH.
+
+    Returns (name, params) of the winner.
+    """
+    if resource not in ("n_samples", "n_estimators"):
+        raise ValueError(f"Unknown search resource: {resource}")
+    if budget_seconds <= 0:
+        raise ValueError(f"The search budget must be positive, got {budget_seconds}s")
+
+    models = train_models(X, y)
+    candidates = [
+        (name, params)
+        for name in models
+        if resource == "n_samples" or name in TREE_MODELS
+        if name in SEARCH_SPACE
+        for params in ParameterGrid(SEARCH_SPACE[name])
+    ]
+
+    folds = list(StratifiedKFold(n_splits=cv).split(np.zeros(len(y)), y))
+    max_resource = (
+        min(len(train_idx) for train_idx, _ in folds)
+        if resource == "n_samples"
+        else min(models[name].get_params()[TREE_MODELS[name]] for name, _ in candidates)
+    )
+    schedule = _resource_schedule(len(candidates), max_resource, min_resource, eta)
+
+    fingerprint = data_fingerprint(X, y)
+    cache = _load_search_cache()
+    os.makedirs("models", exist_ok=True)
+
+    start = time.perf_counter()
+    frontier = []
+    survivors = candidates
+    best = None
+    out_of_budget = False
+
+    for round_, amount in enumerate(schedule):
+        if time.perf_counter() - start > budget_seconds:
+            print(f"⏱️ Budget of {budget_seconds}s used, stopping before round {round_}")
+            break
+
+        tasks = []
+        keys = {}
+        outer, inner = split_jobs(len(survivors) * cv, n_jobs)
+        for c, (name, params) in enumerate(survivors):
+            for fold, (train_idx, test_idx) in enumerate(folds):
+                key = hashlib.sha256(json.dumps(
+                    [fingerprint, name, params, resource, amount, cv, fold],
+                    sort_keys=True, default=str
+                ).encode()).hexdigest()
+                keys[c, fold] = key
+                if key in cache:
+                    continue
+
+                model = clone(models[name]).set_params(**params)
+                if "n_jobs" in model.get_params():
+                    model.set_params(n_jobs=inner)
+                if resource == "n_estimators":
+                    model.set_params(**{TREE_MODELS[name]: amount})
+                else:
+                    rng = np.random.default_rng(fold)
+                    train_idx = np.sort(rng.choice(train_idx, size=amount, replace=False))
+                tasks.append(delayed(_fit_fold)(name, model, X, y, fold, train_idx, test_idx, key))
+
+        # Results are cached as each fit finishes, not at the end of the round
+        with open(SEARCH_CACHE_PATH, "a") as cache_file, \
+                parallel_config(backend="loky", inner_max_num_threads=inner):
+            for result in Parallel(n_jobs=outer, return_as="generator_unordered",
+                                   max_nbytes="1M", mmap_mode="r")(tasks):
+                record = {k: result[k] for k in ("key", "model", "fold", "accuracy", "fit_seconds")}
+                cache_file.write(json.dumps(record) + "\n")
+                cache_file.flush()
+                cache[record["key"]] = record
+                if time.perf_counter() - start > budget_seconds:
+                    # Leaving the generator cancels the fits not started yet
+                    out_of_budget = True
+                    break
+
+        if out_of_budget:
+            print(f"⏱️ Budget of {budget_seconds}s used during round {round_}, "
+                  f"its finished fits are cached")
+            break
+
+        scored = []
+        for c, (name, params) in enumerate(survivors):
+            fits = [cache[keys[c, fold]] for fold in range(cv)]
+            accuracy = float(np.mean([fit["accuracy"] for fit in fits]))
+            fit_seconds = float(np.sum([fit["fit_seconds"] for fit in fits]))
+            scored.append((accuracy, c))
+            frontier.append({
+                "round": round_,
+                "model": name,
+                "params": json.dumps(params, default=str),
+                resource: amount,
+                "fit_seconds": fit_seconds,
+                "cv_accuracy": accuracy,
+            })
+
+        scored.sort(key=lambda item: -item[0])
+        best_accuracy, best_c = scored[0]
+        best = survivors[best_c]
+        print(f"🔎 Round {round_}: {len(survivors)} candidates, {resource}={amount}, "
+              f"best {best[0]} {best[1]} ({best_accuracy:.4f})")
+
+        n_keep = max(1, math.ceil(len(survivors) / eta))
+        survivors = [survivors[c] for _, c in scored[:n_keep]]
+        if len(survivors) == 1 and round_ > 0:
+            break
+
+    pd.DataFrame(frontier).to_csv(SEARCH_LOG_PATH, index=False)
+
+    if best is None:
+        best = candidates[0]
+        print(f"⚠️ No round finished within {budget_seconds}s, "
+              f"falling back to {best[0]} {best[1]}")
+    return best
+
+
+# Rows of the training data used to check the compact export
+EXPORT_CHECK_ROWS = 2000
+
+
+def save_model(model, X_check=None):
+    """
+    Save the model pickle and, given sample rows, its compact export.
+
+    The export is written (and checked against the model on X_check) before
+    the pickle is moved into place, so a reader that sees the new pickle
+    also finds its export. Models without a compact form only get the pickle.
+    """
     os.makedirs("models", exist_ok=True)
-    joblib.dump(best_model, MODEL_PATH)
+    tmp_path = f"{MODEL_PATH}.tmp-{os.getpid()}"
+    joblib.dump(model, tmp_path)
+
+    exported = False
+    if X_check is not None:
+        try:
+            max_diff = export_model(model, X_check[:EXPORT_CHECK_ROWS], tmp_path)
+            exported = True
+            print(f"📦 Compact export saved to: {COMPACT_MODEL_DIR} (max |Δp| {max_diff:.1e})")
+        except (ValueError, AttributeError, KeyError) as e:
+            # the export reads sklearn internals; any mismatch keeps the pickle only
+            print(f"⚠️ Compact export skipped: {type(e).__name__}: {e}")
+    if not exported:
+        remove_export()
+
+    os.replace(tmp_path, MODEL_PATH)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Select and train the career model")
+    parser.add_argument("--cv", type=int, default=5, help="cross-validation folds")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="CPUs to use (-1: all)")
+    parser.add_argument("--search", action="store_true",
+                        help="tune SEARCH_SPACE by successive halving instead of the fixed candidates")
+    parser.add_argument("--resource", choices=["n_samples", "n_estimators"], default="n_samples",
+                        help="what successive halving budgets: training rows or trees")
+    parser.add_argument("--budget", type=float, default=600, help="search time budget (s): no new fits start once it is used, "
+                             "fits already running finish")
+    parser.add_argument("--eta", type=int, default=3, help="keep 1/eta candidates per round")
+    args = parser.parse_args()
+
+    X, y, _ = load_data()
+
+    if args.search:
+        name, params = successive_halving_search(
+            X, y, resource=args.resource, budget_seconds=args.budget,
+            eta=args.eta, cv=args.cv, n_jobs=args.n_jobs
+        )
+        best_model = clone(train_models(X, y)[name]).set_params(**params)
+        best_model.fit(X, y)
+        print(f"\n🏆 Best model: {name} {params}")
+    else:
+        best_model = select_best_model(X, y, cv=args.cv, n_jobs=args.n_jobs)
+
+    save_model(best_model, X_check=X)
 
     print("\n✅ Best model saved successfully")
     print(f"📁 Model path: {MODEL_PATH}")
+    if args.search:
+        print(f"📁 Search frontier: {SEARCH_LOG_PATH}")
+    else:
+        print(f"📁 Fit timings: {SELECTION_LOG_PATH}")
 
 
 if __name__ == "__main__":
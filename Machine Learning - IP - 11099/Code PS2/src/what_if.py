@@ -0,0 +1,63 @@
+import itertools
+
+import numpy as np
+
+from .instrumentation import instrumented
+from .predict_top3 import predict_top_k
+from .slider_limits import FEATURE_LIMITS
+
+MAX_VARIANTS = 5000
+
+
+def build_grid(input_df, features, max_steps=2):
+    """
+    All profiles reachable from row 0 of input_df by moving each of
+    `features` up to `max_steps` slider steps in either direction.
+
+    Values are clipped to the slider ranges and duplicate profiles (e.g.
+    several deltas clipped to 0) are dropped. The unchanged profile is
+    always the first row.
+    """
+    base = input_df.iloc[[0]].reset_index(drop=True)
+    steps = np.arange(-max_steps, max_steps + 1)
+
+    n_variants = len(steps) ** len(features)
+    if n_variants > MAX_VARIANTS:
+        raise ValueError(
+            f"{n_variants} variants requested, at most {MAX_VARIANTS} are scored at once"
+        )
+
+    # Every combination of steps, shape (n_variants, n_features); the
+    # all-zero row is moved to the front so it is the baseline.
+    offsets = np.array(list(itertools.product(steps, repeat=len(features))), dtype=float)
+    offsets = offsets[np.argsort(np.abs(offsets).sum(axis=1), kind="stable")]
+
+    grid = base.loc[np.zeros(len(offsets), dtype=int)].reset_index(drop=True)
+    for j, feature in enumerate(features):
+        low, high, step = FEATURE_LIMITS[feature]
+        values = np.clip(base[feature].iloc[0] + offsets[:, j] * step, low, high)
+        grid[feature] = values.astype(type(step))
+
+    return grid.drop_duplicates(subset=features, ignore_index=True)
+
+
+@instrumented("what_if.score_grid")
+def score_grid(grid, features, k=3):
+    """Score the whole grid with one batched predict_proba call.
+
+    Returns the varied features, the change against the baseline row and
+    the top-k categories and confidences of every variant.
+    """
+    categories, confidences = predict_top_k(grid, k=k)
+
+    result = grid[features].copy()
+    for feature in features:
+        result[f"Δ {feature}"] = grid[feature] - grid[feature].iloc[0]
+    for rank in range(categories.shape[1]):
+        result[f"Top{rank + 1}"] = categories[:, rank]
+        result[f"Top{rank + 1} %"] = confidences[:, rank]
+
+    top_k = [f"Top{rank + 1}" for rank in range(categories.shape[1])]
+    result["Shifted"] = (result[top_k] != result[top_k].iloc[0]).any(axis=1)
+
+    return result
@@ -0,0 +1,65 @@
+"""
+Cold start and interaction latency of the Streamlit app, through AppTest.
+
+Run from Code PS2 in a fresh interpreter (run_benchmarks.py does), so the
+first run pays for every import and artifact load:
+
+    python ../benchmarks/app_latency.py --think 3
+
+Prints one JSON object of seconds:
+
+    first_render           first run of app.py (the profile page)
+    first_recommendation   "Get Career Recommendation" clicked `--think`
+                           seconds later, as a user filling in the form would
+    rerun                  median rerun of the recommendations page
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+THINK_SECONDS = 3.0
+RERUNS = 5
+
+
+def measure_app(app_path="app.py", think=THINK_SECONDS, reruns=RERUNS):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.abspath(app_path), default_timeout=120)
+    timings = {}
+
+    start = time.perf_counter()
+    app.run()
+    timings["first_render"] = time.perf_counter() - start
+
+    time.sleep(think)
+    button = next(b for b in app.button if "Get Career Recommendation" in b.label)
+    start = time.perf_counter()
+    button.click().run()
+    timings["first_recommendation"] = time.perf_counter() - start
+    if app.exception:
+        raise RuntimeError(app.exception[0].message)
+
+    times = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        times.append(time.perf_counter() - start)
+    timings["rerun"] = statistics.median(times)
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streamlit app latency")
+    parser.add_argument("--app", default="app.py", help="path of app.py")
+    parser.add_argument("--think", type=float, default=THINK_SECONDS,
+                        help="seconds between the first render and the first click")
+    args = parser.parse_args()
+
+    print(json.dumps(measure_app(args.app, args.think)))
+
+
+if __name__ == "__main__":
+    main()
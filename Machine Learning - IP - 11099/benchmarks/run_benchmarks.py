@@ -0,0 +1,305 @@
+"""
+Benchmarks of the PS1 and PS2 hot paths on synthetic data.
+
+    python benchmarks/run_benchmarks.py run --sizes 10k,1M,10M --output before.json
+    python benchmarks/run_benchmarks.py compare before.json after.json
+
+run    times every case and writes a JSON file of
+       {"meta": {...}, "results": {case: {"seconds", "min_seconds", "repeats", "rows", ...}}}
+compare  prints the ratio of every case present in both files and exits
+       with status 1 if any case got slower by more than --tolerance.
+
+PS2 cases use the committed models in Code PS2/models. PS1 scripts run
+unchanged against synthetic workbooks in a temporary directory. App cases
+run app.py through Streamlit's AppTest, each repeat in a fresh interpreter.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import runpy
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import sklearn
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+PS1_DIR = os.path.join(ROOT_DIR, "Code PS1")
+PS2_DIR = os.path.join(ROOT_DIR, "Code PS2")
+
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, PS1_DIR)
+sys.path.insert(0, PS2_DIR)
+
+from synthetic_data import career_rows, lead_rows, parse_rows, placement_rows  # noqa: E402
+
+DEFAULT_OUTPUT = os.path.join(BENCH_DIR, "results", "latest.json")
+DEFAULT_TOLERANCE = 0.10
+
+# Training a forest on millions of rows takes hours; bigger sizes are skipped
+MAX_TRAIN_ROWS = 100_000
+
+
+@contextlib.contextmanager
+def working_dir(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def measure(fn, repeat=5, number=1, warmup=True):
+    """Median and best seconds per call of fn over `repeat` timed runs."""
+    if warmup:
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    return {"seconds": statistics.median(times), "min_seconds": min(times), "repeats": repeat}
+
+
+def _result(timing, rows=None):
+    if rows:
+        timing["rows"] = rows
+        timing["rows_per_second"] = rows / timing["seconds"]
+    return timing
+
+
+# -------------------------
+# PS2 CASES
+# -------------------------
+def bench_ps2_serving(results, repeat):
+    from src.predict_top3 import get_scoring_plan, predict_top_3, predict_top_k
+    from src.recommend_field_and_career import load_index, recommend_fields_and_careers
+    from src.scoring_plan import RAW_FEATURES
+
+    profiles = career_rows(10_000, seed=1).drop(columns=["Field", "Career"])
+    row = profiles.head(1)
+    profile = row[RAW_FEATURES].iloc[0].to_dict()
+
+    results["ps2.predict_top_3.single"] = _result(
+        measure(lambda: predict_top_3(row), repeat, number=50))
+    results["ps2.scoring_plan.single"] = _result(
+        measure(lambda: get_scoring_plan().top_k(profile), repeat, number=2000))
+    results["ps2.predict_top_k.batch[10k]"] = _result(
+        measure(lambda: predict_top_k(profiles, k=3), repeat), rows=len(profiles))
+
+    categories = list(load_index())
+    results["ps2.recommend_fields_and_careers"] = _result(measure(
+        lambda: [recommend_fields_and_careers(row, c) for c in categories], repeat, number=200))
+    results["ps2.recommend_fields_and_careers"]["calls"] = len(categories)
+
+
+def bench_ps2_stages(results, n_rows, repeat):
+    from src import pipeline
+    from src.recommend_field_and_career import build_index, count_rows
+
+    label = f"{n_rows:,}".replace(",", "_")
+    df = career_rows(n_rows)
+    config = pipeline.DEFAULT_CONFIG
+
+    outputs = {}
+
+    def stage(name, func, stage_input, times, warmup=True):
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                outputs[name] = func(stage_input, **config[name])
+        results[f"ps2.stage.{name}[{label}]"] = _result(measure(run, times, warmup=warmup), rows=n_rows)
+
+    stage("category", pipeline.run_category, df, repeat)
+    results[f"ps2.recommendation_index[{label}]"] = _result(
+        measure(lambda: build_index(count_rows(outputs["category"])), repeat), rows=n_rows)
+    stage("features", pipeline.run_features, outputs["category"], repeat)
+    stage("clean", pipeline.run_clean, outputs["features"], repeat)
+
+    if n_rows <= MAX_TRAIN_ROWS:
+        # keep the fit timings of the committed model out of the benchmark
+        log_path = pipeline.train_model.SELECTION_LOG_PATH
+        with tempfile.TemporaryDirectory() as tmp:
+            pipeline.train_model.SELECTION_LOG_PATH = os.path.join(tmp, "model_selection.json")
+            try:
+                stage("train", pipeline.run_train, outputs["clean"], 1, warmup=False)
+            finally:
+                pipeline.train_model.SELECTION_LOG_PATH = log_path
+    else:
+        results[f"ps2.stage.train[{label}]"] = {"skipped": f"over {MAX_TRAIN_ROWS} rows"}
+
+
+def bench_app(results, repeat):
+    """Cold start and interaction latency of app.py (see app_latency.py)."""
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, os.path.join(BENCH_DIR, "app_latency.py")],
+                             cwd=PS2_DIR, capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+
+    for name in runs[0]:
+        times = [run[name] for run in runs]
+        results[f"app.{name}"] = {"seconds": statistics.median(times), "min_seconds": min(times),
+                                  "repeats": repeat}
+
+
+# -------------------------
+# PS1 CASES
+# -------------------------
+def run_ps1_script(script, workdir):
+    """Run a PS1 script as `python <script>` from `workdir`, output silenced."""
+    path = os.path.join(PS1_DIR, script)
+    # scripts that parse arguments must not see the benchmark's own
+    saved_argv = sys.argv
+    sys.argv = [path]
+    try:
+        with working_dir(workdir), contextlib.redirect_stdout(io.StringIO()):
+            runpy.run_path(path, run_name="__main__")
+    finally:
+        sys.argv = saved_argv
+
+
+def bench_ps1(results, n_rows, repeat):
+    label = f"{n_rows:,}".replace(",", "_")
+    workdir = tempfile.mkdtemp(prefix="ps1-bench-")
+    try:
+        os.makedirs(os.path.join(workdir, "dataset"))
+        placement_rows(n_rows).to_excel(os.path.join(workdir, "dataset", "01 Train Data.xlsx"), index=False)
+        lead_rows(n_rows).to_excel(os.path.join(workdir, "dataset", "Final Lead Data.xlsx"), index=False)
+
+        results[f"ps1.placement_pipeline[{label}]"] = _result(
+            measure(lambda: run_ps1_script("placement_pipeline.py", workdir), repeat, warmup=False), rows=n_rows)
+        results[f"ps1.graduation_estimation[{label}]"] = _result(
+            measure(lambda: run_ps1_script("graduation_estimation.py", workdir), repeat, warmup=False), rows=n_rows)
+
+        # the estimate alone, without reading and writing the workbooks
+        from graduation_estimation import estimate_graduation
+        leads = lead_rows(n_rows)
+        results[f"ps1.estimate_graduation[{label}]"] = _result(
+            measure(lambda: estimate_graduation(leads), 5), rows=n_rows)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# -------------------------
+# RUN / COMPARE
+# -------------------------
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scikit-learn": sklearn.__version__,
+    }
+
+
+def run(args):
+    sizes = [parse_rows(size) for size in args.sizes.split(",")]
+    results = {}
+
+    with working_dir(PS2_DIR):
+        print("🔎 PS2 serving")
+        bench_ps2_serving(results, args.repeat)
+        for n_rows in sizes:
+            print(f"🔎 PS2 stages, {n_rows:,} rows")
+            bench_ps2_stages(results, n_rows, args.repeat)
+
+    if not args.skip_app:
+        print("🔎 Streamlit app")
+        bench_app(results, args.app_repeat)
+
+    if not args.skip_ps1:
+        print(f"🔎 PS1 scripts, {parse_rows(args.ps1_rows):,} rows")
+        bench_ps1(results, parse_rows(args.ps1_rows), args.ps1_repeat)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump({"meta": environment(), "results": results}, f, indent=2)
+
+    for name, result in results.items():
+        if "skipped" in result:
+            print(f"   {name:<45} skipped ({result['skipped']})")
+        else:
+            print(f"   {name:<45} {result['seconds'] * 1000:12.3f} ms")
+    print("📁 Saved to:", args.output)
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    with open(args.candidate) as f:
+        candidate = json.load(f)["results"]
+
+    regressions = []
+    print(f"{'case':<45} {'baseline ms':>12} {'candidate ms':>12} {'ratio':>7}")
+    for name in sorted(set(baseline) & set(candidate)):
+        old, new = baseline[name], candidate[name]
+        if "seconds" not in old or "seconds" not in new:
+            continue
+        ratio = new["seconds"] / old["seconds"]
+        flag = ""
+        if ratio > 1 + args.tolerance:
+            regressions.append(name)
+            flag = "  ⚠️ slower"
+        elif ratio < 1 - args.tolerance:
+            flag = "  ✅ faster"
+        print(f"{name:<45} {old['seconds'] * 1000:12.3f} {new['seconds'] * 1000:12.3f} {ratio:7.2f}{flag}")
+
+    for name in sorted(set(baseline) ^ set(candidate)):
+        print(f"{name:<45} only in {'baseline' if name in baseline else 'candidate'}")
+
+    if regressions:
+        print(f"\n⚠️ {len(regressions)} case(s) slower than {args.tolerance:.0%} over the baseline")
+        sys.exit(1)
+    print("\n✅ No regressions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PS1/PS2 benchmark suite")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--sizes", default="10k",
+                            help="comma separated row counts for the PS2 stages, e.g. 10k,1M,10M")
+    run_parser.add_argument("--repeat", type=int, default=5, help="timed runs per case")
+    run_parser.add_argument("--ps1-rows", default="5k", help="rows in the synthetic PS1 workbooks")
+    run_parser.add_argument("--ps1-repeat", type=int, default=1, help="timed runs per PS1 script")
+    run_parser.add_argument("--skip-ps1", action="store_true")
+    run_parser.add_argument("--app-repeat", type=int, default=3, help="fresh app processes measured")
+    run_parser.add_argument("--skip-app", action="store_true")
+    run_parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                                help="allowed slowdown before a case counts as a regression")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Synthetic datasets with the schemas of the PS1 and PS2 inputs.
+
+    career_rows(n)     career_path_in_all_field.csv   (PS2)
+    placement_rows(n)  01 Train Data.xlsx             (PS1 placement_pipeline)
+    lead_rows(n)       Final Lead Data.xlsx           (PS1 graduation_estimation)
+
+Value ranges, missing-value rates and category counts follow the real files
+so the benchmarks exercise the same code paths; the values themselves are
+random.
+
+    python benchmarks/synthetic_data.py career 1M career_1m.csv
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# -------------------------
+# PS2 CAREER DATA
+# -------------------------
+FIELDS = [
+    "Engineering", "Chemistry", "Physics", "Law", "Marketing", "Medicine",
+    "Computer Science", "Education", "Business", "Architecture", "Music",
+    "Biology", "Finance", "Psychology", "Art",
+]
+N_CAREERS = 90
+
+# column: (low, high) inclusive integer range, as in the real CSV
+CAREER_COUNTS = {
+    "Extracurricular_Activities": (0, 9),
+    "Internships": (0, 2),
+    "Projects": (0, 4),
+    "Leadership_Positions": (0, 1),
+    "Field_Specific_Courses": (0, 9),
+    "Research_Experience": (0, 1),
+    "Coding_Skills": (0, 4),
+    "Communication_Skills": (0, 4),
+    "Problem_Solving_Skills": (0, 4),
+    "Teamwork_Skills": (0, 4),
+    "Analytical_Skills": (0, 4),
+    "Presentation_Skills": (0, 4),
+    "Networking_Skills": (0, 4),
+    "Industry_Certifications": (0, 1),
+}
+
+# -------------------------
+# PS1 LEAD / PLACEMENT DATA
+# -------------------------
+YEAR_TEXTS = ["1st Year", "2nd Year", "3rd Year", "Final Year"]
+PLACEMENT_LABELED_SHARE = 0.22
+
+
+def parse_rows(text):
+    """'10k' -> 10_000, '1M' -> 1_000_000, '500' -> 500."""
+    text = text.strip()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(text[-1].lower(), 1)
+    return int(float(text[:-1] if multiplier > 1 else text) * multiplier)
+
+
+def _strings(rng, values, n):
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), n)]
+
+
+def career_rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    data = {
+        "Field": _strings(rng, FIELDS, n),
+        "Career": _strings(rng, [f"Career {i:02d}" for i in range(N_CAREERS)], n),
+        "GPA": rng.uniform(2.5, 5.0, n),
+    }
+    for column, (low, high) in CAREER_COUNTS.items():
+        data[column] = rng.integers(low, high + 1, n)
+    return pd.DataFrame(data)
+
+
+def placement_rows(n, seed=0):
+    """Train Data schema; about PLACEMENT_LABELED_SHARE of rows carry a label."""
+    rng = np.random.default_rng(seed)
+    cgpa = np.round(rng.normal(8.0, 1.0, n).clip(6.2, 9.9), 1)
+    speaking = rng.integers(1, 6, n)
+    ml = rng.integers(1, 6, n)
+
+    # placement odds grow with the three features the model uses
+    logit = -1.2 + 0.6 * (cgpa - 8) + 0.3 * (speaking - 3) + 0.3 * (ml - 3)
+    placed = rng.random(n) < 1 / (1 + np.exp(-logit))
+    status = np.where(placed, "Placed", "Not placed").astype(object)
+    status[rng.random(n) > PLACEMENT_LABELED_SHARE] = None
+
+    ids = np.arange(n)
+    return pd.DataFrame({
+        "First Name": [f"Student{i}" for i in ids],
+        "Email ID": [f"student{i}@xyz.com" for i in ids],
+        "Quantity": 1,
+        "Price Tier": np.nan,
+        "Ticket Type": _strings(rng, ["Art of Resume Building", "Hello ML and DL"], n),
+        "Attendee #": 2_213_855_057.0 + ids,
+        "Group": np.nan,
+        "Order Type": "Free Order",
+        "Currency": "USD",
+        "Total Paid": 0,
+        "Fees Paid": 0.0,
+        "Eventbrite Fees": 0,
+        "Eventbrite Payment Processing": 0,
+        "Attendee Status": "Attending",
+        "College Name": _strings(rng, [f"College {i}" for i in range(300)], n),
+        "How did you come to know about this event?": _strings(rng, ["Email", "Whatsapp", "Others"], n),
+        'Specify in "Others" (how did you come to know about this event)': None,
+        "Designation": "Students",
+        "Year of Graduation": None,
+        "CGPA": cgpa,
+        "Speaking Skills": speaking,
+        "ML Knowledge": ml,
+        "Placement Status": status,
+    })
+
+
+def lead_rows(n, seed=0):
+    """Final Lead Data schema, with the real share of missing year columns."""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(n)
+
+    academic_year = rng.choice([1.0, 2.0, 3.0, 4.0], n, p=[0.07, 0.27, 0.48, 0.18])
+    academic_year[rng.random(n) < 0.53] = np.nan
+    year_text = _strings(rng, YEAR_TEXTS, n)
+    year_text[rng.random(n) < 0.975] = None
+
+    return pd.DataFrame({
+        "ID": 68_000 + ids,
+        "First Name": [f"Student{i}" for i in ids],
+        "Email": [f"student{i}@xyz.com" for i in ids],
+        "Gender": None,
+        "City": None,
+        "Created": "04/27/2022 01:41:38 pm",
+        "Position": None,
+        "New College Name": None,
+        "Colleges": None,
+        "Academic Year": academic_year,
+        "Branch/ Specialisation": None,
+        "Other Branch": None,
+        "What is your current academic year?": year_text,
+        "Company Name/ College Name": None,
+        "Would you like to know more about us and our programs?": "yes",
+        "Are you interested in knowing more about our events?": "yes",
+        "Have you recommended Cloud Counselage to anyone?": "no",
+        "How did you come to know about this event?": None,
+    })
+
+
+GENERATORS = {
+    "career": career_rows,
+    "placement": placement_rows,
+    "lead": lead_rows,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic PS1/PS2 dataset")
+    parser.add_argument("dataset", choices=GENERATORS)
+    parser.add_argument("rows", help="row count, e.g. 10k or 1M")
+    parser.add_argument("output", help=".csv or .xlsx file to write")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    df = GENERATORS[args.dataset](parse_rows(args.rows), seed=args.seed)
+    if args.output.endswith(".xlsx"):
+        df.to_excel(args.output, index=False)
+    else:
+        df.to_csv(args.output, index=False)
+
+    print(f"✅ {len(df)} {args.dataset} rows")
+    print("📁 Saved to:", args.output)
+
+
+if __name__ == "__main__":
+    main()